@@ -0,0 +1,243 @@
+"""Columnar sales snapshot for the admin reports page.
+
+Orders and their line items are held as parallel NumPy arrays, so a report is
+a mask and a bincount rather than a database round trip. main.py feeds it
+order rows (with embedded order_items): everything once, then only orders dated
+at or after the newest one already held, plus orders an admin has edited. An
+order that arrives again replaces its earlier rows, so overlapping fetches are
+harmless. Amounts are integer paise (money.py).
+
+NumPy is imported when the first snapshot is built, not when the app starts.
+"""
+import threading
+from datetime import date, datetime, timezone
+
+import money
+
+_EPOCH = date(1970, 1, 1).toordinal()
+EXCLUDED_STATUSES = frozenset({"Cancelled"})
+PERIODS = ("day", "week", "month")
+
+_ORDER_COLUMNS = {"o_day": "int32", "o_month": "int32", "o_total": "int64", "o_units": "int64",
+                  "o_counted": bool}
+_ITEM_COLUMNS = {"i_order": "int32", "i_day": "int32", "i_product": "int32", "i_qty": "int64",
+                 "i_paise": "int64", "i_counted": bool}
+
+
+def day_number(value):
+    """Days since 1970-01-01 (UTC) of an ISO timestamp, or None if it does not parse."""
+    try:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.toordinal() - _EPOCH
+
+
+def day_date(day):
+    return date.fromordinal(int(day) + _EPOCH)
+
+
+def _month_of(day):
+    d = day_date(day)
+    return d.year * 12 + d.month - 1
+
+
+def _bucket_start(period, bucket):
+    """First date of a day/week/month bucket number."""
+    if period == "day":
+        return day_date(bucket)
+    if period == "week":
+        return day_date(bucket * 7 - 3)  # weeks start on Monday; 1970-01-01 was a Thursday
+    return date(int(bucket) // 12, int(bucket) % 12 + 1, 1)
+
+
+class _Snapshot:
+    """One immutable generation of the arrays; readers keep whichever they picked up."""
+
+    def __init__(self, columns, order_ids, product_ids):
+        self.__dict__.update(columns)
+        self.order_ids = order_ids      # row -> order id
+        self.product_ids = product_ids  # product index -> product id
+
+    def orders_in(self, start, end):
+        return self.o_counted & (self.o_day >= start) & (self.o_day <= end)
+
+    def items_in(self, start, end):
+        return self.i_counted & (self.i_day >= start) & (self.i_day <= end)
+
+
+def _empty_columns():
+    import numpy as np
+    return {name: np.empty(0, dtype) for name, dtype in {**_ORDER_COLUMNS, **_ITEM_COLUMNS}.items()}
+
+
+class SalesSnapshot:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None        # _Snapshot, built on first use
+        self._order_rows = {}    # order id -> row in the order arrays
+        self._product_pos = {}   # product id -> product index
+        self._dead = 0           # superseded order rows still in the arrays
+        self.latest = None       # newest order date held, as stored
+
+    def load(self, orders):
+        """Replace everything with `orders`. Readers keep the previous data until the new is complete."""
+        with self._lock:
+            self._merge(orders, _Snapshot(_empty_columns(), [], []), {}, {}, 0, None)
+
+    def apply(self, orders):
+        """Add or replace orders (rows with embedded order_items)."""
+        with self._lock:
+            self._merge(orders, self._snapshot(), self._order_rows, self._product_pos, self._dead, self.latest)
+
+    def _merge(self, orders, old, order_rows, product_pos, dead, latest):
+        """Build the next generation from `old` plus `orders` and swap it in; the caller holds the lock."""
+        import numpy as np
+        order_ids = list(old.order_ids)
+        product_ids = list(old.product_ids)
+        new_orders = {name: [] for name in _ORDER_COLUMNS}
+        new_items = {name: [] for name in _ITEM_COLUMNS}
+        order_rows = dict(order_rows)
+        product_pos = dict(product_pos)
+        replaced = []
+
+        for order in orders:
+            previous = order_rows.get(order["id"])
+            if previous is not None:
+                replaced.append(previous)
+            row = len(order_ids)
+            order_ids.append(order["id"])
+            order_rows[order["id"]] = row
+
+            day = day_number(order.get("date"))
+            counted = day is not None and order.get("status") not in EXCLUDED_STATUSES
+            day = day if day is not None else -1
+            if order.get("date") and (latest is None or str(order["date"]) > latest):
+                latest = str(order["date"])
+
+            units = 0
+            for item in order.get("order_items") or []:
+                position = product_pos.get(item.get("product_id"))
+                if position is None:
+                    position = product_pos[item.get("product_id")] = len(product_ids)
+                    product_ids.append(item.get("product_id"))
+                quantity = int(item.get("quantity") or 0)
+                units += quantity
+                new_items["i_order"].append(row)
+                new_items["i_day"].append(day)
+                new_items["i_product"].append(position)
+                new_items["i_qty"].append(quantity)
+                new_items["i_paise"].append(money.line_total_paise(
+                    item.get("price_at_purchase") or 0, quantity, item.get("discount_amount") or 0))
+                new_items["i_counted"].append(counted)
+
+            new_orders["o_day"].append(day)
+            new_orders["o_month"].append(_month_of(day))
+            new_orders["o_total"].append(money.to_paise(order.get("total") or 0))
+            new_orders["o_units"].append(units)
+            new_orders["o_counted"].append(counted)
+
+        columns = {}
+        for name, dtype in {**_ORDER_COLUMNS, **_ITEM_COLUMNS}.items():
+            added = new_orders[name] if name in new_orders else new_items[name]
+            columns[name] = np.concatenate([getattr(old, name), np.asarray(added, dtype=dtype)])
+
+        if replaced:
+            # Superseded rows stay in the arrays but no longer count
+            replaced = np.asarray(replaced, dtype="int64")
+            columns["o_counted"][replaced] = False
+            columns["i_counted"][np.isin(columns["i_order"], replaced)] = False
+            dead += len(replaced)
+            if dead > len(order_ids) // 2:
+                columns, order_ids, order_rows = self._compact(columns, order_ids, order_rows)
+                dead = 0
+        self._data = _Snapshot(columns, order_ids, product_ids)
+        self._order_rows, self._product_pos, self._dead = order_rows, product_pos, dead
+        self.latest = latest
+
+    @staticmethod
+    def _compact(columns, order_ids, order_rows):
+        """Drop superseded order and item rows, renumbering the item -> order links."""
+        import numpy as np
+        keep = np.zeros(len(order_ids), dtype=bool)
+        keep[np.fromiter(order_rows.values(), dtype="int64", count=len(order_rows))] = True
+        new_row = np.cumsum(keep) - 1
+        keep_items = keep[columns["i_order"]]
+        for name in _ORDER_COLUMNS:
+            columns[name] = columns[name][keep]
+        for name in _ITEM_COLUMNS:
+            columns[name] = columns[name][keep_items]
+        columns["i_order"] = new_row[columns["i_order"]].astype("int32")
+        order_ids = [order_id for order_id, kept in zip(order_ids, keep) if kept]
+        return columns, order_ids, {order_id: row for row, order_id in enumerate(order_ids)}
+
+    def _snapshot(self):
+        data = self._data
+        return data if data is not None else _Snapshot(_empty_columns(), [], [])
+
+    # --- Reports (start and end are inclusive day numbers) ---
+
+    def summary(self, start, end):
+        data = self._snapshot()
+        orders = data.orders_in(start, end)
+        count = int(orders.sum())
+        revenue = int(data.o_total[orders].sum())
+        units = int(data.o_units[orders].sum())
+        return {
+            "orders": count,
+            "revenue": money.from_paise(revenue),
+            "units": units,
+            "average_order_value": money.from_paise(revenue) / count if count else 0.0,
+            "average_basket_units": units / count if count else 0.0,
+        }
+
+    def revenue_series(self, start, end, period="day"):
+        """[(period start date, revenue, orders)] for every day/week/month in the range."""
+        if end < start:
+            return []
+        import numpy as np
+        data = self._snapshot()
+        orders = data.orders_in(start, end)
+        if period == "day":
+            buckets, first, last = data.o_day[orders], start, end
+        elif period == "week":
+            buckets, first, last = (data.o_day[orders] + 3) // 7, (start + 3) // 7, (end + 3) // 7
+        else:
+            buckets, first, last = data.o_month[orders], _month_of(start), _month_of(end)
+        size = last - first + 1
+        revenue = np.bincount(buckets - first, weights=data.o_total[orders], minlength=size)
+        counts = np.bincount(buckets - first, minlength=size)
+        return [(_bucket_start(period, first + i), money.from_paise(int(revenue[i])), int(counts[i]))
+                for i in range(size)]
+
+    def _product_totals(self, start, end):
+        import numpy as np
+        data = self._snapshot()
+        items = data.items_in(start, end)
+        products = data.i_product[items]
+        size = len(data.product_ids)
+        revenue = np.bincount(products, weights=data.i_paise[items], minlength=size)
+        units = np.bincount(products, weights=data.i_qty[items], minlength=size)
+        return data.product_ids, revenue, units
+
+    def top_products(self, start, end, limit=10):
+        """[(product id, units, revenue)] with the highest line revenue."""
+        import numpy as np
+        product_ids, revenue, units = self._product_totals(start, end)
+        sold = np.flatnonzero(units)
+        top = sold[np.argsort(-revenue[sold], kind="stable")[:limit]]
+        return [(product_ids[i], int(units[i]), money.from_paise(int(revenue[i]))) for i in top]
+
+    def revenue_by_category(self, start, end, category_of):
+        """[(category, units, revenue)], highest revenue first; category_of maps product id -> category."""
+        product_ids, revenue, units = self._product_totals(start, end)
+        totals = {}
+        for i in units.nonzero()[0]:
+            category = category_of.get(product_ids[i]) or "Uncategorized"
+            entry = totals.setdefault(category, [0, 0])
+            entry[0] += int(units[i])
+            entry[1] += int(revenue[i])
+        ranked = sorted(totals.items(), key=lambda kv: -kv[1][1])
+        return [(category, units_sold, money.from_paise(paise)) for category, (units_sold, paise) in ranked]
@@ -0,0 +1,355 @@
+"""End-to-end benchmark for the storefront, checkout, admin and PDF paths.
+
+Drives the Flask app in-process against the local SQLite backend
+(local_backend.py) seeded with a dataset of the requested size, and reports
+throughput and p50/p95/p99 latency per route.
+
+    python bench.py --products 5000 --orders 50000 --requests 200
+    python bench.py --baseline bench_baseline.json --update-baseline   # record a baseline
+    python bench.py --baseline bench_baseline.json                     # compare against it
+
+The seeded database is built once per dataset size under instance/bench/ and
+copied for every run, so runs start from identical data. Comparing against a
+baseline exits non-zero when a route's p95 latency or throughput regresses by
+more than --threshold percent.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "bench")
+
+SCENARIOS = ["shop", "cart_add", "cart", "order_place", "my_orders",
+             "admin_dashboard", "admin_orders", "admin_order_pdf"]
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, errors, wall_seconds):
+    ordered = sorted(latencies)
+    ms = lambda s: round(s * 1000, 3)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1]) if ordered else 0.0,
+    }
+
+
+def prepare_database(products, orders, customers, seed):
+    """Path to a fresh copy of the seeded database for this dataset size."""
+    from local_backend import LocalClient, seed as seed_database
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    template = os.path.join(BENCH_DIR, f"seed-{products}p-{orders}o-{customers}c-{seed}.sqlite3")
+    if not os.path.exists(template):
+        print(f"Seeding {template} ...", flush=True)
+        partial = template + ".partial"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(partial + suffix):
+                os.remove(partial + suffix)
+        client = LocalClient(partial)
+        seed_database(client, products, orders, customers, seed)
+        client.connection().execute("pragma wal_checkpoint(truncate)")
+        client.connection().close()
+        os.replace(partial, template)
+
+    workdir = tempfile.mkdtemp(prefix="rk-bench-")
+    path = os.path.join(workdir, "bench.sqlite3")
+    shutil.copyfile(template, path)
+    return workdir, path
+
+
+class Session:
+    """One logged-in test client (one simulated user)."""
+
+    def __init__(self, app, email, password):
+        self.client = app.test_client()
+        res = self.client.post("/login", data={"mode": "login", "email": email, "password": password})
+        if res.status_code != 302 or "/login" in res.headers.get("Location", ""):
+            raise RuntimeError(f"Login failed for {email}")
+
+    def empty_cart(self):
+        # Submitting the cart form with no quantities drops every line
+        self.client.post("/cart", data={"update_cart": "1"})
+
+
+class Bench:
+    def __init__(self, app, supabase, rng, customers):
+        self.app = app
+        self.rng = rng
+        self.customers = customers
+        self._lock = threading.Lock()
+        products = supabase.table("products").select("id").gt("stock", 50).limit(2000).execute().data
+        self.product_ids = [p["id"] for p in products]
+        orders = supabase.table("orders").select("id").order("date", desc=True).limit(2000).execute().data
+        self.order_ids = [o["id"] for o in orders]
+        self._next_order = 0
+        if not self.product_ids or not self.order_ids:
+            raise RuntimeError("Seeded dataset has no products in stock or no orders")
+
+    def customer_session(self, worker):
+        n = worker % max(1, self.customers)
+        return Session(self.app, f"customer{n}@local", "customer123")
+
+    def admin_session(self, worker):
+        return Session(self.app, "admin@local", "admin123")
+
+    def product(self):
+        return self.rng.choice(self.product_ids)
+
+    def next_order_id(self):
+        # Every PDF request is for a different order, so it measures a cold render
+        with self._lock:
+            order_id = self.order_ids[self._next_order % len(self.order_ids)]
+            self._next_order += 1
+        return order_id
+
+    # Each scenario returns (session factory, per-iteration setup, timed request, ok check)
+    def scenario(self, name):
+        ok_status = lambda res: res.status_code in (200, 302)
+        if name == "shop":
+            return self.customer_session, None, lambda s: s.client.get("/shop"), ok_status
+        if name == "cart_add":
+            def add(s):
+                return s.client.post("/cart/add", data={"product_id": self.product(), "quantity": 1})
+
+            def reset_every_ten(s):
+                s.adds = getattr(s, "adds", 0) + 1
+                if s.adds % 10 == 0:
+                    s.empty_cart()
+            return self.customer_session, reset_every_ten, add, ok_status
+        if name == "cart":
+            def fill(s):
+                if not getattr(s, "filled", False):
+                    for _ in range(5):
+                        s.client.post("/cart/add", data={"product_id": self.product(), "quantity": 1})
+                    s.filled = True
+            return self.customer_session, fill, lambda s: s.client.get("/cart"), ok_status
+        if name == "order_place":
+            def fill(s):
+                for _ in range(self.rng.randint(1, 3)):
+                    s.client.post("/cart/add", data={"product_id": self.product(), "quantity": 1})
+
+            def placed(res):
+                return res.status_code == 302 and "/my_orders" in res.headers.get("Location", "")
+            return self.customer_session, fill, lambda s: s.client.post("/order/place"), placed
+        if name == "my_orders":
+            return self.customer_session, None, lambda s: s.client.get("/my_orders"), ok_status
+        if name == "admin_dashboard":
+            return self.admin_session, None, lambda s: s.client.get("/admin/dashboard"), ok_status
+        if name == "admin_orders":
+            return self.admin_session, None, lambda s: s.client.get("/admin/orders"), ok_status
+        if name == "admin_order_pdf":
+            def pdf(s):
+                # A cache miss answers 202 with a job to poll; time the whole wait
+                url = f"/admin/order/{self.next_order_id()}/pdf"
+                res = s.client.get(url, headers={"Accept": "application/json"})
+                while res.status_code == 202 and res.get_json()["status"] == "pending":
+                    time.sleep(0.01)
+                    res = s.client.get(url, headers={"Accept": "application/json"})
+                return res
+            return (self.admin_session, None, pdf,
+                    lambda res: res.status_code == 200 and res.data[:5] == b"%PDF-")
+        raise ValueError(f"Unknown scenario {name}")
+
+    def run(self, name, requests, concurrency, warmup):
+        make_session, setup, request, ok = self.scenario(name)
+        sessions = [make_session(worker) for worker in range(concurrency)]
+        for s in sessions:
+            for _ in range(warmup):
+                if setup:
+                    setup(s)
+                request(s)
+
+        latencies, errors = [], [0]
+        remaining = [requests]
+        busy = [0.0] * len(sessions)  # per user, time spent in timed requests only
+        counter_lock = threading.Lock()
+
+        def worker(index, s):
+            while True:
+                with counter_lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                if setup:
+                    setup(s)
+                started = time.perf_counter()
+                res = request(s)
+                elapsed = time.perf_counter() - started
+                busy[index] += elapsed
+                with counter_lock:
+                    latencies.append(elapsed)
+                    if not ok(res):
+                        errors[0] += 1
+
+        threads = [threading.Thread(target=worker, args=(i, s)) for i, s in enumerate(sessions)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # Untimed setup (filling carts) is left out of throughput as well as latency
+        return summarize(latencies, errors[0], max(busy))
+
+
+def compare(results, baseline, threshold, imports=None):
+    """Print per-route changes against a baseline; returns the list of regressions."""
+    regressions = []
+    print(f"\nAgainst baseline from {baseline['meta'].get('timestamp', '?')} "
+          f"({baseline['meta'].get('git_commit', '?')}):")
+    before, current = baseline["meta"].get("imports"), imports
+    if before and current:
+        print(f"  {'import main':<16} {before['main_ms']:>9.0f} -> {current['main_ms']:>9.0f} ms")
+    for name, current in results.items():
+        before = baseline["results"].get(name)
+        if not before:
+            print(f"  {name:<16} (no baseline)")
+            continue
+        p95_change = (current["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        rps_change = ((current["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100
+                      if before["throughput_rps"] else 0.0)
+        flag = ""
+        if p95_change > threshold or rps_change < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<16} p95 {before['p95_ms']:>9.2f} -> {current['p95_ms']:>9.2f} ms ({p95_change:+6.1f}%)  "
+              f"rps {before['throughput_rps']:>8.2f} -> {current['throughput_rps']:>8.2f} ({rps_change:+6.1f}%){flag}")
+    return regressions
+
+
+def import_report(top=8):
+    """Cold `import main` in a fresh interpreter, which is what a gunicorn worker
+    pays at boot: total milliseconds and the slowest modules main imports directly.
+    Run with the benchmark's environment already set. None if the import fails."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True,
+                          text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        print(f"Import report failed: {proc.stderr.strip().splitlines()[-1:]}")
+        return None
+    total, modules = None, {}
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2][1:]  # two spaces of indent per nesting level
+        if name == "main":
+            total = int(parts[1]) / 1000
+        elif name.startswith("  ") and not name.startswith("   "):
+            modules[name.strip()] = int(parts[1]) / 1000
+    slowest = sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {"main_ms": round(total or 0.0, 1), "modules_ms": {name: round(ms, 1) for name, ms in slowest}}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the store end to end on a seeded local database")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--customers", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=100, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed requests per simulated user first")
+    parser.add_argument("--concurrency", type=int, default=1, help="simulated users per scenario")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every database call")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "latest.json"))
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--threshold", type=float, default=20.0, help="allowed regression in percent")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    workdir, db_path = prepare_database(args.products, args.orders, args.customers, args.seed)
+    # The backend is chosen when main is imported, so configure it first
+    os.environ["DB_BACKEND"] = "sqlite"
+    os.environ["SQLITE_PATH"] = db_path
+    os.environ["LOCAL_DB_LATENCY_MS"] = str(args.latency_ms)
+    os.environ.setdefault("PDF_CACHE_DIR", os.path.join(workdir, "pdf_cache"))
+    os.environ.setdefault("CART_DB_PATH", os.path.join(workdir, "carts.sqlite3"))
+
+    imports = import_report()
+    if imports:
+        print(f"Worker import: {imports['main_ms']:.0f} ms  (slowest: "
+              + ", ".join(f"{name} {ms:.0f}" for name, ms in imports["modules_ms"].items()) + ")")
+
+    import main as app_module
+
+    bench = Bench(app_module.app, app_module.supabase, random.Random(args.seed), args.customers)
+    results = {}
+    print(f"{'route':<16} {'reqs':>6} {'err':>4} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    try:
+        for name in scenarios:
+            r = bench.run(name, args.requests, args.concurrency, args.warmup)
+            results[name] = r
+            print(f"{name:<16} {r['requests']:>6} {r['errors']:>4} {r['throughput_rps']:>9.2f} "
+                  f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}", flush=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": {"products": args.products, "orders": args.orders, "customers": args.customers,
+                        "seed": args.seed},
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "imports": imports,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("dataset", "concurrency", "latency_ms"):
+            if baseline["meta"].get(key) != report["meta"][key]:
+                print(f"Warning: baseline was recorded with a different {key}: {baseline['meta'].get(key)}")
+        if compare(results, baseline, args.threshold, imports):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
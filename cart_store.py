@@ -0,0 +1,146 @@
+"""Server-side cart storage.
+
+Carts live in a small SQLite file instead of the signed session cookie; the
+cookie only carries the cart id. Each line is just (product_id, quantity) plus
+the price the customer last saw, so a later price change can be pointed out.
+Names, current prices, images and stock are looked up when the cart is shown.
+carts.item_count is kept in step with the lines on every write, so the badge
+count shown on every page is a single primary-key lookup.
+"""
+import os
+import time
+import secrets
+import sqlite3
+import threading
+
+CART_TTL_DAYS = float(os.getenv("CART_TTL_DAYS", "30"))
+_PRUNE_INTERVAL = 3600  # seconds between sweeps of abandoned carts
+
+SCHEMA = """
+create table if not exists carts (
+    id text primary key,
+    item_count integer not null default 0,
+    updated_at real not null
+);
+create table if not exists cart_lines (
+    cart_id text not null references carts (id) on delete cascade,
+    product_id text not null,
+    quantity integer not null,
+    price real,
+    primary key (cart_id, product_id)
+);
+create index if not exists carts_updated_idx on carts (updated_at);
+"""
+
+
+class CartStore:
+    """Nothing is opened until first use, and connections are per thread and per
+    process, so a store created before gunicorn forks its workers is safe to use
+    in each of them."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._last_prune = 0.0
+        self._schema_pid = None
+        self._schema_lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        pid = os.getpid()
+        # A connection inherited across fork() belongs to the parent; never touch it
+        if conn is None or self._local.pid != pid:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("pragma journal_mode = wal")
+            conn.execute("pragma synchronous = normal")
+            conn.execute("pragma foreign_keys = on")
+            conn.execute("pragma busy_timeout = 5000")
+            self._local.conn, self._local.pid = conn, pid
+            if self._schema_pid != pid:
+                with self._schema_lock:
+                    if self._schema_pid != pid:
+                        conn.executescript(SCHEMA)
+                        self._schema_pid = pid
+        return conn
+
+    def _write(self, cart_id, statements):
+        """Run (sql, params) statements and refresh the cart's item_count in one transaction."""
+        conn = self._connection()
+        conn.execute("begin immediate")
+        try:
+            for sql, params in statements:
+                conn.execute(sql, params)
+            conn.execute(
+                "update carts set updated_at = ?, "
+                "item_count = (select coalesce(sum(quantity), 0) from cart_lines where cart_id = ?) "
+                "where id = ?", (time.time(), cart_id, cart_id))
+            conn.execute("commit")
+        except Exception:
+            conn.execute("rollback")
+            raise
+
+    def _prune(self):
+        now = time.time()
+        if now - self._last_prune < _PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        self._connection().execute("delete from carts where updated_at < ?", (now - CART_TTL_DAYS * 86400,))
+
+    def create(self):
+        self._prune()
+        cart_id = secrets.token_urlsafe(16)
+        self._connection().execute("insert into carts (id, updated_at) values (?, ?)", (cart_id, time.time()))
+        return cart_id
+
+    def exists(self, cart_id):
+        return self._connection().execute("select 1 from carts where id = ?", (cart_id,)).fetchone() is not None
+
+    def count(self, cart_id):
+        row = self._connection().execute("select item_count from carts where id = ?", (cart_id,)).fetchone()
+        return row[0] if row else 0
+
+    def lines(self, cart_id):
+        """[(product_id, quantity, price last seen)] in the order they were first added."""
+        return self._connection().execute(
+            "select product_id, quantity, price from cart_lines where cart_id = ? order by rowid",
+            (cart_id,)).fetchall()
+
+    def quantity(self, cart_id, product_id):
+        row = self._connection().execute(
+            "select quantity from cart_lines where cart_id = ? and product_id = ?", (cart_id, product_id)).fetchone()
+        return row[0] if row else 0
+
+    def add(self, cart_id, product_id, quantity, price=None):
+        """Add to a line. `price` is recorded only for a new line: re-adding an item
+        keeps the price first seen until set_prices() records that the customer was
+        shown the change."""
+        self._write(cart_id, [(
+            "insert into cart_lines (cart_id, product_id, quantity, price) values (?, ?, ?, ?) "
+            "on conflict (cart_id, product_id) do update set quantity = quantity + excluded.quantity, "
+            "price = coalesce(price, excluded.price)",
+            (cart_id, product_id, quantity, price))])
+
+    def set_quantities(self, cart_id, quantities):
+        """Replace line quantities; zero or less removes the line."""
+        statements = []
+        for product_id, quantity in quantities.items():
+            if quantity > 0:
+                statements.append((
+                    "insert into cart_lines (cart_id, product_id, quantity) values (?, ?, ?) "
+                    "on conflict (cart_id, product_id) do update set quantity = excluded.quantity",
+                    (cart_id, product_id, quantity)))
+            else:
+                statements.append(("delete from cart_lines where cart_id = ? and product_id = ?",
+                                   (cart_id, product_id)))
+        if statements:
+            self._write(cart_id, statements)
+
+    def set_prices(self, cart_id, prices):
+        """Record the prices the customer has now been shown."""
+        self._connection().executemany(
+            "update cart_lines set price = ? where cart_id = ? and product_id = ?",
+            [(price, cart_id, product_id) for product_id, price in prices.items()])
+
+    def clear(self, cart_id):
+        self._connection().execute("delete from carts where id = ?", (cart_id,))
@@ -0,0 +1,142 @@
+"""Data client settings and lazy construction, plus concurrent query fan-out.
+
+PostgREST calls go through one httpx connection pool per client: connections are
+kept alive between requests, bounded in number, and every call has explicit
+connect/read timeouts instead of the library defaults (see supabase_backend.py).
+`gather()` runs a view's independent queries side by side so the page waits for
+the slowest one, not the sum.
+
+create_backend() returns that client, or the local SQLite stand-in from
+local_backend.py when DB_BACKEND=sqlite, built on first use in each process.
+create_auth_backend() returns a second one used only to sign users in and up.
+Neither backend module is imported until then, so importing the app does not
+load supabase, postgrest or httpx.
+"""
+import os
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+DB_KEEPALIVE_CONNECTIONS = int(os.getenv("DB_KEEPALIVE_CONNECTIONS", "10"))
+DB_KEEPALIVE_EXPIRY = float(os.getenv("DB_KEEPALIVE_EXPIRY", "30"))
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "3"))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "10"))  # read/write, and the default gather() deadline
+DB_FANOUT_WORKERS = int(os.getenv("DB_FANOUT_WORKERS", "8"))
+
+DB_BACKEND = os.getenv("DB_BACKEND", "supabase").lower()
+
+
+def _build_backend(url, key):
+    if DB_BACKEND == "sqlite":
+        from local_backend import LocalClient
+        return LocalClient(os.getenv("SQLITE_PATH"))
+    from supabase_backend import create_pooled_client
+    return create_pooled_client(url, key)
+
+
+def _build_auth_backend(url, key):
+    if DB_BACKEND == "sqlite":
+        from local_backend import LocalClient
+        return LocalClient(os.getenv("SQLITE_PATH"))
+    from supabase_backend import create_auth_client
+    return create_auth_client(url, key)
+
+
+class LazyBackend:
+    """Stands in for the data client and builds the real one on first use in each process.
+
+    Importing the app then costs no client setup or supabase import, and under
+    `gunicorn --preload` every worker gets its own connection pool instead of
+    sockets inherited across fork().
+    """
+
+    def __init__(self, url, key, build=_build_backend):
+        self._args = (url, key)
+        self._build = build
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def client(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._client = self._build(*self._args)
+                    self._pid = pid
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.client(), name)
+
+
+def create_backend(url, key):
+    """The app's data client: hosted Supabase, or the local SQLite file with DB_BACKEND=sqlite."""
+    return LazyBackend(url, key)
+
+
+def create_auth_backend(url, key):
+    """Client for auth.sign_in_with_password / sign_up only.
+
+    A sign-in puts the user's JWT on the signing client's PostgREST headers, so
+    it must not be the data client: that one keeps the service-role key, which
+    the security-definer functions in sql/ are granted to.
+    """
+    return LazyBackend(url, key, build=_build_auth_backend)
+
+
+_fanout = ThreadPoolExecutor(max_workers=DB_FANOUT_WORKERS, thread_name_prefix="db-fanout")
+_in_fanout = threading.local()
+
+
+def _call(task):
+    # Query builders are executed; anything else is a zero-argument callable
+    execute = getattr(task, "execute", None)
+    return execute() if execute is not None else task()
+
+
+def _run_in_fanout(task):
+    _in_fanout.active = True
+    try:
+        return _call(task)
+    finally:
+        _in_fanout.active = False
+
+
+def gather(*tasks, timeout=DB_TIMEOUT, return_exceptions=False):
+    """Run independent queries concurrently and return their results in order.
+
+    Each task is a query builder (its .execute() is called) or a zero-argument
+    callable. The first task runs on the calling thread (bounded by the HTTP
+    timeouts). Raises the first error in task order unless return_exceptions is
+    set, and TimeoutError if the other tasks are still running `timeout` seconds
+    after the call.
+
+    A gather() issued from inside a fanned-out task runs its tasks inline, so
+    nested helpers cannot starve the shared pool.
+    """
+    if not tasks:
+        return []
+    if len(tasks) == 1 or getattr(_in_fanout, "active", False):
+        futures = None
+    else:
+        # Each task carries a copy of the caller's context (request metrics, see metrics.py)
+        futures = [_fanout.submit(contextvars.copy_context().run, _run_in_fanout, task) for task in tasks[1:]]
+
+    deadline = time.monotonic() + timeout
+    results = []
+    for index, task in enumerate(tasks):
+        try:
+            if index == 0 or futures is None:
+                results.append(_call(task))
+            else:
+                results.append(futures[index - 1].result(timeout=max(0, deadline - time.monotonic())))
+        except TimeoutError:
+            raise
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+    return results
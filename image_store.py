@@ -0,0 +1,98 @@
+"""Local product image store with pre-sized variants.
+
+An upload is decoded once and saved as a small set of fixed-size WebP
+variants (a grid thumbnail and a detail image) named by the SHA-256 of the
+uploaded bytes and the variant settings, e.g. `3f2a...-thumb.webp`. The same
+picture always gets the same name and a new picture a new one, so the files
+can be cached by browsers for a year. Products store the detail URL; variant_url() swaps in another
+variant for local images and leaves third-party URLs alone.
+
+Pillow is optional: without it uploads are refused and existing files are
+still served. It is imported on the first upload, not when the app starts.
+"""
+import io
+import os
+import re
+import hashlib
+import importlib.util
+
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+IMAGE_URL_PREFIX = "/images/"
+IMAGE_MAX_UPLOAD_BYTES = int(float(os.getenv("IMAGE_MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+IMAGE_MAX_PIXELS = 40_000_000  # refuse decompression bombs well before they use memory
+VARIANTS = {
+    "thumb": (480, 360),    # shop grid cards, cart and admin lists
+    "detail": (1200, 1200),
+}
+DEFAULT_VARIANT = "detail"
+WEBP_QUALITY = 82
+
+# Part of every name, so changing sizes or quality yields new URLs rather than stale cached files
+_SETTINGS_TAG = repr((sorted(VARIANTS.items()), WEBP_QUALITY)).encode()
+_NAME_RE = re.compile(r"^([0-9a-f]{24})-(" + "|".join(VARIANTS) + r")\.webp$")
+
+
+class ImageUploadError(ValueError):
+    pass
+
+
+def _file_name(digest, variant):
+    return f"{digest}-{variant}.webp"
+
+
+def variant_url(url, variant):
+    """URL of `variant` for an image stored here; any other URL is returned unchanged."""
+    if not url or not url.startswith(IMAGE_URL_PREFIX):
+        return url
+    match = _NAME_RE.match(url[len(IMAGE_URL_PREFIX):])
+    if not match:
+        return url
+    return IMAGE_URL_PREFIX + _file_name(match.group(1), variant)
+
+
+def is_variant_name(name):
+    return bool(_NAME_RE.match(name or ""))
+
+
+class ImageStore:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def save(self, data):
+        """Store every variant of an uploaded image; returns the URL of the default variant."""
+        if not PIL_AVAILABLE:
+            raise ImageUploadError("Image uploads need Pillow (pip install Pillow).")
+        if len(data) > IMAGE_MAX_UPLOAD_BYTES:
+            raise ImageUploadError(f"Images must be under {IMAGE_MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+        from PIL import Image, ImageOps
+        digest = hashlib.sha256(_SETTINGS_TAG + data).hexdigest()[:24]
+        if all(os.path.exists(os.path.join(self.root, _file_name(digest, v))) for v in VARIANTS):
+            return IMAGE_URL_PREFIX + _file_name(digest, DEFAULT_VARIANT)
+
+        try:
+            with Image.open(io.BytesIO(data)) as source:
+                if source.width * source.height > IMAGE_MAX_PIXELS:
+                    raise ImageUploadError("That image is too large to process.")
+                image = ImageOps.exif_transpose(source)
+                image.load()
+        except ImageUploadError:
+            raise
+        except Exception as e:
+            raise ImageUploadError("That file is not an image that can be read (use JPEG, PNG or WebP).") from e
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+        for variant, size in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail(size, Image.LANCZOS)  # keeps aspect ratio, never enlarges
+            buffer = io.BytesIO()
+            resized.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+            # Write then rename, so a half-written file is never served under its final name
+            path = os.path.join(self.root, _file_name(digest, variant))
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(buffer.getvalue())
+            os.replace(tmp, path)
+        return IMAGE_URL_PREFIX + _file_name(digest, DEFAULT_VARIANT)
@@ -0,0 +1,154 @@
+"""Invoice PDF rendering, runnable in a separate process pool.
+
+Rendering is CPU-bound (WeasyPrint), so web workers hand it to a small pool of
+processes and stay free for storefront traffic. Everything passed in is plain
+data (order/item/settings dicts and the already rendered invoice HTML), so the
+pool processes only import this module, never the Flask app.
+"""
+import io
+import os
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+
+# ✅ Force white background and black text
+FORCE_WHITE_CSS = """
+    @page { background: #ffffff; color: #000000; }
+    html, body {
+        background: #ffffff !important;
+        color: #000000 !important;
+        font-family: Arial, sans-serif;
+        margin: 25px;
+    }
+    * {
+        background: #ffffff !important;
+        color: #000000 !important;
+        border-color: #000000 !important;
+        box-shadow: none !important;
+    }
+    th {
+        background: #f2f2f2 !important;
+    }
+    a, .btn, .btn-download {
+        background: #000000 !important;
+        color: #ffffff !important;
+    }
+"""
+
+def render_invoice_pdf(order_id, order, items, bill, rendered_html):
+    """PDF bytes for an invoice (WeasyPrint first, ReportLab fallback)."""
+    totals = order["calculated_totals"]
+    taxable, cgst, sgst, grand = (totals["taxable_value"], totals["cgst_amount"],
+                                  totals["sgst_amount"], totals["grand_total"])
+
+    # Try WeasyPrint first — import safely
+    try:
+        from weasyprint import HTML, CSS
+
+        force_white_css = CSS(string=FORCE_WHITE_CSS)
+
+        # ✅ Generate PDF (ignore Tailwind/global CSS)
+        return HTML(string=rendered_html).write_pdf(stylesheets=[force_white_css])
+
+    except (ImportError, OSError):
+        # Fall back to ReportLab if WeasyPrint (or its native libraries) is not available
+        pass
+
+    # ReportLab fallback (if WeasyPrint import failed)
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=letter)
+    width, height = letter
+    y = height - 50
+
+    def line(text, step=14):
+        nonlocal y
+        c.drawString(40, y, str(text))
+        y -= step
+
+    # Header
+    c.setFont("Helvetica-Bold", 12)
+    line(f"Invoice: {order_id[:8]}")
+    c.setFont("Helvetica", 10)
+    line(bill["companyName"])
+    line(bill["companyAddress"])
+    line("")
+    line(f"Customer: {order.get('customer_name', 'N/A')}")
+    line(f"Date: {order.get('date', 'N/A')}")
+    line("")
+
+    # Items
+    c.setFont("Helvetica-Bold", 10)
+    line("Items:")
+    c.setFont("Helvetica", 10)
+    for it in items:
+        line(f" - {it['product_name']} x{int(it['quantity'])} @ ₹{it['price_at_purchase']:.2f} "
+             f"(-₹{it['discount_amount']:.2f}) = ₹{it['line_total']:.2f}")
+        if y < 80:
+            c.showPage()
+            y = height - 50
+
+    # Totals
+    c.setFont("Helvetica-Bold", 10)
+    line("")
+    line(f"Taxable Value: ₹{taxable:.2f}")
+    line(f"CGST ({bill['tax_rate_cgst']:.2f}%): ₹{cgst:.2f}")
+    line(f"SGST ({bill['tax_rate_sgst']:.2f}%): ₹{sgst:.2f}")
+    line(f"Grand Total: ₹{grand:.2f}")
+
+    # Footer
+    c.setFont("Helvetica", 10)
+    line("")
+    line("Bank Details:")
+    line(f"Bank: {bill['bank_name']}")
+    line(f"Account: {bill['account_number']}")
+    line(bill["footerText"])
+
+    c.showPage()
+    c.save()
+
+    pdf_data = buf.getvalue()
+    buf.close()
+    return pdf_data
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the web worker is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=PDF_RENDER_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _reset_pool(broken):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False)
+
+def submit_render(order_id, order, items, bill, rendered_html):
+    """Future resolving to the PDF bytes. Renders inline when PDF_RENDER_WORKERS=0."""
+    args = (order_id, order, items, bill, rendered_html)
+    if PDF_RENDER_WORKERS <= 0:
+        future = Future()
+        try:
+            future.set_result(render_invoice_pdf(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    pool = _get_pool()
+    try:
+        return pool.submit(render_invoice_pdf, *args)
+    except BrokenProcessPool:
+        # A crashed child poisons the whole pool; start a fresh one and retry once
+        _reset_pool(pool)
+        return _get_pool().submit(render_invoice_pdf, *args)
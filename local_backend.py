@@ -0,0 +1,795 @@
+"""Local SQLite backend that stands in for the hosted Supabase project.
+
+Set DB_BACKEND=sqlite (and optionally SQLITE_PATH) to run the app, load tests
+or profiling without network access. LocalClient implements the slice of the
+supabase client that main.py uses:
+
+    table(name).select / insert / update / upsert / delete
+        .eq .neq .gt .gte .lt .lte .like .ilike .in_ .is_ .or_
+        .order .limit .single .maybe_single .execute
+    rpc(name, params).execute
+    auth.sign_in_with_password / sign_up / admin.create_user / update_user_by_id / delete_user
+
+for the products, orders, order_items, profiles, site_settings and
+custom_billing_data tables, plus Python versions of the SQL functions in sql/.
+LOCAL_DB_LATENCY_MS adds a fixed delay to every call to imitate the network
+round trip to Supabase.
+
+    python local_backend.py seed --products 5000 --orders 50000 --customers 500
+"""
+import os
+import re
+import json
+import time
+import uuid
+import random
+import sqlite3
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+
+import money
+from metrics import timed
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "local.sqlite3")
+LOCAL_DB_LATENCY_MS = float(os.getenv("LOCAL_DB_LATENCY_MS", "0"))
+
+_NOW = "strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')"
+
+SCHEMA = f"""
+create table if not exists products (
+    id text primary key,
+    name text not null,
+    category text,
+    price real not null default 0,
+    stock integer not null default 0,
+    description text,
+    "imageUrl" text,
+    created_at text not null default ({_NOW})
+);
+create table if not exists orders (
+    id text primary key,
+    user_id text,
+    customer_name text,
+    total real not null default 0,
+    status text not null default 'Pending',
+    date text not null default ({_NOW}),
+    updated_at text not null default ({_NOW})
+);
+create table if not exists order_items (
+    id text primary key,
+    order_id text not null references orders (id) on delete cascade,
+    product_id text,
+    quantity integer not null,
+    price_at_purchase real not null,
+    discount_amount real not null default 0
+);
+create table if not exists profiles (
+    id text primary key,
+    name text,
+    phone text,
+    address text,
+    role text not null default 'customer',
+    created_at text not null default ({_NOW})
+);
+create table if not exists site_settings (
+    page_key text primary key,
+    content text
+);
+create table if not exists custom_billing_data (
+    id text primary key,
+    person_name text,
+    phone_number text,
+    address text,
+    amount_pending real default 0,
+    short_note text,
+    last_updated text not null default ({_NOW})
+);
+create table if not exists auth_users (
+    id text primary key,
+    email text not null unique,
+    password_hash text not null,
+    created_at text not null default ({_NOW})
+);
+create index if not exists products_category_idx on products (category);
+create index if not exists orders_status_idx on orders (status);
+create index if not exists orders_date_idx on orders (date desc);
+create index if not exists orders_user_idx on orders (user_id, date desc);
+create index if not exists order_items_order_idx on order_items (order_id);
+create index if not exists profiles_role_idx on profiles (role);
+"""
+
+# sql/orders_updated_at.sql: any change to an order or its items moves orders.updated_at
+TRIGGERS = f"""
+create trigger if not exists orders_touch_updated_at
+after update of user_id, customer_name, total, status, date on orders
+begin
+    update orders set updated_at = ({_NOW}) where id = new.id;
+end;
+create trigger if not exists order_items_touch_insert after insert on order_items
+begin
+    update orders set updated_at = ({_NOW}) where id = new.order_id;
+end;
+create trigger if not exists order_items_touch_update after update on order_items
+begin
+    update orders set updated_at = ({_NOW}) where id in (old.order_id, new.order_id);
+end;
+create trigger if not exists order_items_touch_delete after delete on order_items
+begin
+    update orders set updated_at = ({_NOW}) where id = old.order_id;
+end;
+"""
+
+# Columns stored as JSON text and decoded on read (jsonb in Postgres)
+JSON_COLUMNS = {"site_settings": {"content"}}
+# Tables whose id Postgres fills in with gen_random_uuid()
+UUID_DEFAULT_TABLES = {"order_items", "custom_billing_data"}
+# Embedded selects such as '*, order_items(*)': (parent, child) -> child's foreign key
+RELATIONS = {("orders", "order_items"): "order_id"}
+
+
+class LocalBackendError(Exception):
+    """Raised where PostgREST would return an error response."""
+
+
+class LocalResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _simulate_latency():
+    if LOCAL_DB_LATENCY_MS > 0:
+        time.sleep(LOCAL_DB_LATENCY_MS / 1000)
+
+
+def _quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _split_top_level(text, sep=","):
+    """Split on `sep` outside parentheses and double quotes."""
+    parts, depth, quoted, current, i = [], 0, False, [], 0
+    while i < len(text):
+        ch = text[i]
+        if quoted:
+            if ch == "\\" and i + 1 < len(text):
+                current.append(text[i:i + 2])
+                i += 2
+                continue
+            if ch == '"':
+                quoted = False
+        elif ch == '"':
+            quoted = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            i += 1
+            continue
+        current.append(ch)
+        i += 1
+    if current:
+        parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', value[1:-1])
+    return value
+
+
+class LocalClient:
+    """Drop-in for supabase.Client backed by one SQLite file (a connection per thread)."""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("SQLITE_PATH") or DEFAULT_SQLITE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        self._columns = {}
+        conn = self.connection()
+        conn.executescript(SCHEMA)
+        if "updated_at" not in [row[1] for row in conn.execute("pragma table_info(orders)")]:
+            # Files created before orders.updated_at
+            conn.execute("alter table orders add column updated_at text")
+            conn.execute(f"update orders set updated_at = ({_NOW})")
+        conn.executescript(TRIGGERS)
+        for table in ("products", "orders", "order_items", "profiles", "site_settings",
+                      "custom_billing_data", "auth_users"):
+            self._columns[table] = [row[1] for row in conn.execute(f"pragma table_info({table})")]
+        self.auth = LocalAuth(self)
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma journal_mode = wal")
+            conn.execute("pragma synchronous = normal")
+            conn.execute("pragma foreign_keys = on")
+            conn.execute("pragma busy_timeout = 5000")
+            self._local.conn = conn
+        return conn
+
+    def columns(self, table):
+        try:
+            return self._columns[table]
+        except KeyError:
+            raise LocalBackendError(f'relation "{table}" does not exist') from None
+
+    def table(self, name):
+        return LocalQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, fn, params):
+        return LocalRpc(self, fn, params or {})
+
+    def decode_row(self, table, row):
+        data = dict(row)
+        for column in JSON_COLUMNS.get(table, ()):
+            if data.get(column) is not None:
+                data[column] = json.loads(data[column])
+        return data
+
+    def encode_value(self, table, column, value):
+        if column in JSON_COLUMNS.get(table, ()) and value is not None:
+            return json.dumps(value)
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+
+class LocalQuery:
+    """PostgREST-style query builder; each filter appends a SQL condition."""
+
+    _OPS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.client.columns(table)
+        self.action = "select"
+        self.columns = "*"
+        self.count_mode = None
+        self.payload = None
+        self.on_conflict = None
+        self.where = []
+        self.params = []
+        self.orders = []
+        self.limit_n = None
+        self.single_mode = None
+
+    # --- statements ---
+    def select(self, columns="*", count=None):
+        self.columns = columns
+        self.count_mode = count
+        return self
+
+    def insert(self, rows):
+        self.action, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.action, self.payload, self.on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values):
+        self.action, self.payload = "update", values
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    # --- filters ---
+    def _column(self, name):
+        if name not in self.client.columns(self.table):
+            raise LocalBackendError(f'column {self.table}.{name} does not exist')
+        return _quote_ident(name)
+
+    def _condition(self, column, op, value):
+        """(sql, params) for one PostgREST operator."""
+        col = self._column(column)
+        if op in self._OPS:
+            return f"{col} {self._OPS[op]} ?", [value]
+        if op == "like":
+            return f"{col} like ?", [str(value).replace("*", "%")]
+        if op == "ilike":
+            return f"lower({col}) like lower(?)", [str(value).replace("*", "%")]
+        if op == "in":
+            values = list(value)
+            if not values:
+                return "0", []
+            return f"{col} in ({', '.join('?' * len(values))})", values
+        if op == "is":
+            keyword = {None: "null", "null": "null", True: "1", "true": "1", False: "0", "false": "0"}[value]
+            return (f"{col} is null", []) if keyword == "null" else (f"{col} = {keyword}", [])
+        raise LocalBackendError(f"unsupported operator {op}")
+
+    def _filter(self, column, op, value):
+        sql, params = self._condition(column, op, value)
+        self.where.append(sql)
+        self.params.extend(params)
+        return self
+
+    def eq(self, column, value): return self._filter(column, "eq", value)
+    def neq(self, column, value): return self._filter(column, "neq", value)
+    def gt(self, column, value): return self._filter(column, "gt", value)
+    def gte(self, column, value): return self._filter(column, "gte", value)
+    def lt(self, column, value): return self._filter(column, "lt", value)
+    def lte(self, column, value): return self._filter(column, "lte", value)
+    def like(self, column, pattern): return self._filter(column, "like", pattern)
+    def ilike(self, column, pattern): return self._filter(column, "ilike", pattern)
+    def in_(self, column, values): return self._filter(column, "in", values)
+    def is_(self, column, value): return self._filter(column, "is", value)
+
+    def _logic_tree(self, expression, joiner):
+        """SQL for a PostgREST logic tree such as `a.lt.1,and(a.eq.1,id.lt."x")`."""
+        parts, params = [], []
+        for term in _split_top_level(expression):
+            match = re.fullmatch(r"(and|or)\((.*)\)", term, re.S)
+            if match:
+                sql, sub = self._logic_tree(match.group(2), match.group(1))
+            else:
+                column, op, raw = term.split(".", 2)
+                negate = op == "not"
+                if negate:
+                    op, raw = raw.split(".", 1)
+                if op == "in":
+                    value = [_unquote(v) for v in _split_top_level(raw.strip("()"))]
+                else:
+                    value = _unquote(raw)
+                sql, sub = self._condition(column, op, value)
+                if negate:
+                    sql = f"not ({sql})"
+            parts.append(f"({sql})")
+            params.extend(sub)
+        return f" {joiner} ".join(parts), params
+
+    def or_(self, expression):
+        expression = expression.strip()
+        if expression.startswith("(") and expression.endswith(")"):
+            expression = expression[1:-1]
+        sql, params = self._logic_tree(expression, "or")
+        self.where.append(f"({sql})")
+        self.params.extend(params)
+        return self
+
+    # --- modifiers ---
+    def order(self, column, desc=False, nullsfirst=False, foreign_table=None):
+        # Mirrors postgrest-py: the desc flag applies to the last column in the string
+        spec = f"{column}{'.desc' if desc else ''}{'.nullsfirst' if nullsfirst else ''}"
+        for part in spec.split(","):
+            name, *modifiers = part.strip().split(".")
+            direction = "desc" if "desc" in modifiers else "asc"
+            # Postgres puts NULLs last ascending and first descending; SQLite does the opposite
+            nulls_first = "nullsfirst" in modifiers or (direction == "desc" and "nullslast" not in modifiers)
+            nulls = " nulls first" if nulls_first else " nulls last"
+            self.orders.append(f"{self._column(name)} {direction}{nulls}")
+        return self
+
+    def limit(self, size, foreign_table=None):
+        self.limit_n = int(size)
+        return self
+
+    def single(self):
+        self.single_mode = "single"
+        return self
+
+    def maybe_single(self):
+        self.single_mode = "maybe"
+        return self
+
+    # --- execution ---
+    def _where_sql(self):
+        return (" where " + " and ".join(self.where)) if self.where else ""
+
+    def _parse_columns(self):
+        plain, embeds = [], []
+        for part in _split_top_level(self.columns or "*"):
+            match = re.fullmatch(r"(\w+)\((.*)\)", part)
+            if match:
+                embeds.append(match.group(1))
+            else:
+                plain.append(part)
+        return plain, embeds
+
+    def _embed(self, rows, child):
+        fk = RELATIONS.get((self.table, child))
+        if fk is None:
+            raise LocalBackendError(f"no relationship between {self.table} and {child}")
+        ids = [row["id"] for row in rows]
+        by_parent = {row_id: [] for row_id in ids}
+        conn = self.client.connection()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            sql = f"select * from {child} where {fk} in ({', '.join('?' * len(chunk))}) order by rowid"
+            for item in conn.execute(sql, chunk):
+                by_parent[item[fk]].append(self.client.decode_row(child, item))
+        for row in rows:
+            row[child] = by_parent[row["id"]]
+
+    def _select(self):
+        conn = self.client.connection()
+        plain, embeds = self._parse_columns()
+        if "*" in plain:
+            cols = "*"
+        else:
+            needed = list(dict.fromkeys(plain + (["id"] if embeds else [])))
+            cols = ", ".join(self._column(c) for c in needed)
+        sql = f"select {cols} from {self.table}{self._where_sql()}"
+        if self.orders:
+            sql += " order by " + ", ".join(self.orders)
+        if self.limit_n is not None:
+            sql += f" limit {self.limit_n}"
+        rows = [self.client.decode_row(self.table, r) for r in conn.execute(sql, self.params)]
+        for child in embeds:
+            self._embed(rows, child)
+        if embeds and "*" not in plain and "id" not in plain:
+            for row in rows:
+                row.pop("id", None)
+
+        count = None
+        if self.count_mode:
+            count = conn.execute(f"select count(*) from {self.table}{self._where_sql()}", self.params).fetchone()[0]
+        return rows, count
+
+    def _rows_payload(self):
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        prepared = []
+        for row in rows:
+            row = dict(row)
+            if "id" not in row and self.table in UUID_DEFAULT_TABLES:
+                row["id"] = str(uuid.uuid4())
+            for column in row:
+                self._column(column)
+            prepared.append(row)
+        return prepared
+
+    def _insert(self, upsert=False):
+        conn = self.client.connection()
+        out = []
+        rows = self._rows_payload()
+        conn.execute("begin")
+        try:
+            for row in rows:
+                columns = list(row)
+                sql = (f"insert into {self.table} ({', '.join(_quote_ident(c) for c in columns)}) "
+                       f"values ({', '.join('?' * len(columns))})")
+                if upsert:
+                    target = self.on_conflict or "id"
+                    updates = [c for c in columns if c != target]
+                    action = (f"do update set {', '.join(f'{_quote_ident(c)} = excluded.{_quote_ident(c)}' for c in updates)}"
+                              if updates else "do nothing")
+                    sql += f" on conflict ({self._column(target)}) {action}"
+                sql += " returning *"
+                values = [self.client.encode_value(self.table, c, row[c]) for c in columns]
+                out.extend(self.client.decode_row(self.table, r) for r in conn.execute(sql, values))
+            conn.execute("commit")
+        except sqlite3.Error as e:
+            conn.execute("rollback")
+            raise LocalBackendError(str(e)) from e
+        return out
+
+    def _update(self):
+        values = dict(self.payload)
+        if not values:
+            return []
+        sets = ", ".join(f"{self._column(c)} = ?" for c in values)
+        params = [self.client.encode_value(self.table, c, v) for c, v in values.items()]
+        sql = f"update {self.table} set {sets}{self._where_sql()} returning *"
+        try:
+            cursor = self.client.connection().execute(sql, params + self.params)
+            return [self.client.decode_row(self.table, r) for r in cursor]
+        except sqlite3.Error as e:
+            raise LocalBackendError(str(e)) from e
+
+    def _delete(self):
+        sql = f"delete from {self.table}{self._where_sql()} returning *"
+        try:
+            cursor = self.client.connection().execute(sql, self.params)
+            return [self.client.decode_row(self.table, r) for r in cursor]
+        except sqlite3.Error as e:
+            raise LocalBackendError(str(e)) from e
+
+    def execute(self):
+        with timed("backend"):
+            _simulate_latency()
+            count = None
+            if self.action == "select":
+                rows, count = self._select()
+            elif self.action == "insert":
+                rows = self._insert()
+            elif self.action == "upsert":
+                rows = self._insert(upsert=True)
+            elif self.action == "update":
+                rows = self._update()
+            else:
+                rows = self._delete()
+
+        if self.single_mode:
+            if len(rows) > 1 or (not rows and self.single_mode == "single"):
+                raise LocalBackendError(f"JSON object requested, multiple (or no) rows returned ({len(rows)})")
+            return LocalResponse(rows[0] if rows else None, count)
+        return LocalResponse(rows, count)
+
+
+# --- RPC FUNCTIONS (Python versions of sql/*.sql) ---
+RPC_FUNCTIONS = {}
+
+def rpc_function(name):
+    def register(fn):
+        RPC_FUNCTIONS[name] = fn
+        return fn
+    return register
+
+
+class LocalRpc:
+    def __init__(self, client, fn, params):
+        self.client = client
+        self.fn = fn
+        self.params = params
+
+    def execute(self):
+        with timed("backend"):
+            _simulate_latency()
+            fn = RPC_FUNCTIONS.get(self.fn)
+            if fn is None:
+                raise LocalBackendError(f"function {self.fn} does not exist")
+            conn = self.client.connection()
+            # BEGIN IMMEDIATE takes the write lock up front, like the row locks in the SQL versions
+            conn.execute("begin immediate")
+            try:
+                result = fn(self.client, conn, **self.params)
+                conn.execute("commit")
+            except Exception as e:
+                conn.execute("rollback")
+                if isinstance(e, LocalBackendError):
+                    raise
+                raise LocalBackendError(str(e)) from e
+            return LocalResponse(result)
+
+
+def _take_stock(conn, lines):
+    """Decrement stock for {product_id: quantity}, refusing any shortfall."""
+    ids = sorted(lines)
+    found = {row["id"]: row for row in conn.execute(
+        f"select id, name, stock from products where id in ({', '.join('?' * len(ids))})", ids)}
+    for product_id in ids:
+        row = found.get(product_id)
+        if row is None or row["stock"] < lines[product_id]:
+            raise LocalBackendError(f"Not enough stock for {row['name'] if row else product_id}")
+    conn.executemany("update products set stock = stock - ? where id = ?",
+                     [(lines[pid], pid) for pid in ids])
+
+
+@rpc_function("decrement_stock")
+def _rpc_decrement_stock(client, conn, product_id_to_update, quantity_to_decrement):
+    _take_stock(conn, {product_id_to_update: int(quantity_to_decrement)})
+    return None
+
+
+@rpc_function("place_order_batch")
+def _rpc_place_order_batch(client, conn, order_record, items):
+    if not items:
+        raise LocalBackendError("Order has no items")
+    lines = {}
+    for item in items:
+        lines[item["product_id"]] = lines.get(item["product_id"], 0) + int(item["quantity"])
+    _take_stock(conn, lines)
+    # Prices come from the products table, as in the SQL function
+    prices = {row["id"]: row["price"] for row in conn.execute(
+        f"select id, price from products where id in ({', '.join('?' * len(lines))})", list(lines))}
+    rows = [(item.get("id") or str(uuid.uuid4()), item["order_id"], item["product_id"], int(item["quantity"]),
+             prices[item["product_id"]], 0) for item in items]
+    total = money.from_paise(money.order_totals(
+        {"price_at_purchase": row[4], "quantity": row[3]} for row in rows).grand)
+    conn.execute(
+        "insert into orders (id, user_id, customer_name, total, status) values (?, ?, ?, ?, ?)",
+        (order_record["id"], order_record.get("user_id"), order_record.get("customer_name"),
+         total, order_record.get("status") or "Pending"))
+    conn.executemany(
+        "insert into order_items (id, order_id, product_id, quantity, price_at_purchase, discount_amount) "
+        "values (?, ?, ?, ?, ?, ?)", rows)
+    return order_record["id"]
+
+
+@rpc_function("update_order_details_batch")
+def _rpc_update_order_details_batch(client, conn, order_id_to_update, new_status, items):
+    conn.executemany(
+        "update order_items set quantity = ?, discount_amount = ? where order_id = ? and id = ?",
+        [(int(item["quantity"]), item.get("discount_amount") or 0, order_id_to_update, item["id"])
+         for item in items or []])
+    total = money.from_paise(money.order_totals(
+        dict(row) for row in conn.execute("select price_at_purchase, quantity, discount_amount from order_items "
+                                          "where order_id = ?", (order_id_to_update,))).grand)
+    cursor = conn.execute("update orders set status = coalesce(?, status), total = ? where id = ?",
+                          (new_status, total, order_id_to_update))
+    if cursor.rowcount == 0:
+        raise LocalBackendError(f"Order {order_id_to_update} not found")
+    return total
+
+
+@rpc_function("bulk_adjust_products")
+def _rpc_bulk_adjust_products(client, conn, target_category, price_percent, stock_delta):
+    where, params = ("where category = ?", (target_category,)) if target_category is not None else ("", ())
+    rows = conn.execute(f"select id, price, stock from products {where}", params).fetchall()
+    conn.executemany("update products set price = ?, stock = ? where id = ?", [
+        (money.from_paise(money.apply_percent(money.to_paise(row["price"]), price_percent or 0)),
+         max(row["stock"] + int(stock_delta or 0), 0), row["id"]) for row in rows])
+    return len(rows)
+
+
+@rpc_function("admin_dashboard_stats")
+def _rpc_admin_dashboard_stats(client, conn):
+    row = conn.execute("""
+        select coalesce((select sum(total) from orders), 0) as total_revenue,
+               (select count(*) from orders) as total_orders,
+               (select count(*) from orders where status = 'Pending') as pending_orders,
+               (select count(*) from profiles where role = 'customer') as total_customers
+    """).fetchone()
+    return dict(row)
+
+
+# --- AUTH ---
+class _Obj:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def _hash_password(password, salt=None):
+    salt = salt or os.urandom(16).hex()
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), 100_000).hex()
+    return f"{salt}${digest}"
+
+
+class LocalAuth:
+    """Email/password accounts in auth_users; profiles are created from user metadata
+    the way the Supabase signup trigger does."""
+
+    def __init__(self, client):
+        self.client = client
+        self.admin = _LocalAuthAdmin(self)
+
+    def _create(self, email, password, metadata):
+        if not email or not password or len(password) < 6:
+            raise LocalBackendError("Email and a password of at least 6 characters are required")
+        user_id = str(uuid.uuid4())
+        metadata = metadata or {}
+        conn = self.client.connection()
+        conn.execute("begin")
+        try:
+            conn.execute("insert into auth_users (id, email, password_hash) values (?, ?, ?)",
+                         (user_id, email.lower(), _hash_password(password)))
+            conn.execute("insert into profiles (id, name, phone, address, role) values (?, ?, ?, ?, ?)",
+                         (user_id, metadata.get("name"), metadata.get("phone"), metadata.get("address"),
+                          metadata.get("role") or "customer"))
+            conn.execute("commit")
+        except sqlite3.Error as e:
+            conn.execute("rollback")
+            raise LocalBackendError(str(e)) from e
+        user = _Obj(id=user_id, email=email.lower(), user_metadata=metadata)
+        return _Obj(user=user, session=None)
+
+    def sign_up(self, credentials):
+        options = credentials.get("options") or {}
+        return self._create(credentials.get("email"), credentials.get("password"), options.get("data"))
+
+    def sign_in_with_password(self, credentials):
+        _simulate_latency()
+        email = (credentials.get("email") or "").lower()
+        row = self.client.connection().execute(
+            "select id, email, password_hash from auth_users where email = ?", (email,)).fetchone()
+        if row is not None:
+            salt = row["password_hash"].split("$", 1)[0]
+            if _hash_password(credentials.get("password") or "", salt) == row["password_hash"]:
+                user = _Obj(id=row["id"], email=row["email"])
+                return _Obj(user=user, session=_Obj(user=user, access_token=f"local-{row['id']}"))
+        raise LocalBackendError("Invalid login credentials")
+
+
+class _LocalAuthAdmin:
+    def __init__(self, auth):
+        self.auth = auth
+
+    def create_user(self, attributes):
+        return self.auth._create(attributes.get("email"), attributes.get("password"),
+                                 attributes.get("user_metadata"))
+
+    def update_user_by_id(self, user_id, attributes):
+        if "password" in attributes:
+            self.auth.client.connection().execute(
+                "update auth_users set password_hash = ? where id = ?",
+                (_hash_password(attributes["password"]), user_id))
+        return _Obj(user=_Obj(id=user_id))
+
+    def delete_user(self, user_id):
+        self.auth.client.connection().execute("delete from auth_users where id = ?", (user_id,))
+
+
+# --- SEED DATA ---
+CATEGORIES = ["Cement", "Steel", "PVC Pipes", "Fittings", "Paint", "Tools", "Electrical", "Tiles"]
+NOUNS = ["Elbow", "Coupling", "Tee", "Valve", "Rod", "Sheet", "Brush", "Wire", "Bag", "Tile", "Drill", "Clamp"]
+
+
+def seed(client, products=1000, orders=10000, customers=200, random_seed=42):
+    """Fill an empty database with a deterministic production-sized dataset.
+
+    Accounts: admin@local / admin123 and customer<N>@local / customer123.
+    """
+    rng = random.Random(random_seed)
+    conn = client.connection()
+    if conn.execute("select count(*) from products").fetchone()[0]:
+        raise LocalBackendError(f"{client.path} already has data; seed an empty database")
+
+    client.auth.sign_up({"email": "admin@local", "password": "admin123",
+                         "options": {"data": {"name": "Local Admin", "role": "admin"}}})
+    user_ids = []
+    for n in range(customers):
+        res = client.auth.sign_up({"email": f"customer{n}@local", "password": "customer123",
+                                   "options": {"data": {"name": f"Customer {n}", "phone": f"98{n:08d}",
+                                                        "address": f"{n} Market Road", "role": "customer"}}})
+        user_ids.append((res.user.id, f"Customer {n}"))
+
+    now = datetime.now(timezone.utc)
+    catalog = []
+    for n in range(products):
+        category = rng.choice(CATEGORIES)
+        name = f"{category} {rng.choice(NOUNS)} {n}"
+        price = round(rng.uniform(10, 5000), 2)
+        created = (now - timedelta(days=rng.randint(0, 720))).isoformat()
+        catalog.append((f"prod_{n:06d}", name, category, price, rng.randint(0, 500),
+                        f"{name} for site work", None, created))
+
+    statuses = ["Pending", "In Process", "Ready to Collect", "Received/Delivered", "Cancelled"]
+    order_rows, item_rows = [], []
+    for n in range(orders):
+        user_id, user_name = rng.choice(user_ids) if user_ids else (None, "Walk-in")
+        order_id = f"ord_{n:08d}"
+        total = 0.0
+        for product in rng.sample(catalog, rng.randint(1, 5)) if catalog else []:
+            quantity = rng.randint(1, 10)
+            total += product[3] * quantity
+            item_rows.append((str(uuid.UUID(int=rng.getrandbits(128))), order_id, product[0], quantity, product[3], 0))
+        date = (now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))).isoformat()
+        order_rows.append((order_id, user_id, user_name, round(total, 2), rng.choice(statuses), date))
+
+    conn.execute("begin")
+    conn.executemany('insert into products (id, name, category, price, stock, description, "imageUrl", created_at) '
+                     "values (?, ?, ?, ?, ?, ?, ?, ?)", catalog)
+    conn.executemany("insert into orders (id, user_id, customer_name, total, status, date) values (?, ?, ?, ?, ?, ?)",
+                     order_rows)
+    conn.executemany("insert into order_items (id, order_id, product_id, quantity, price_at_purchase, discount_amount) "
+                     "values (?, ?, ?, ?, ?, ?)", item_rows)
+    conn.execute("commit")
+    conn.execute("analyze")
+    return {"products": len(catalog), "orders": len(order_rows), "order_items": len(item_rows),
+            "customers": len(user_ids)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local SQLite backend")
+    parser.add_argument("command", choices=["init", "seed"])
+    parser.add_argument("--path", default=None, help="database file (default: SQLITE_PATH or instance/local.sqlite3)")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    client = LocalClient(args.path)
+    if args.command == "seed":
+        counts = seed(client, args.products, args.orders, args.customers, args.seed)
+        print(f"Seeded {client.path}: {counts}")
+    else:
+        print(f"Initialised {client.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Per-request timing and Prometheus text exposition.
+
+init_app() times every request and splits the time into backend calls,
+template renders and PDF renders, each a histogram labeled by Flask endpoint.
+Backend clients wrap their calls in `timed("backend")`; code waiting on a PDF
+render wraps the wait in `timed("pdf")`. Template time comes from Flask's
+render signals.
+
+Metrics live in process memory, so under gunicorn each worker reports its own
+numbers; scrape every worker or sum them in Prometheus. Component times are
+summed per request, so concurrent backend calls (db.gather) can add up to more
+than the request's wall time.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import request, before_render_template, template_rendered
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COMPONENTS = ("backend", "template", "pdf")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = _labels(self.labelnames, labels, f'le="{_number(bound)}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-2])}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram("rk_request_duration_seconds", "Wall time to handle a request.", ("endpoint", "method"))
+COMPONENT_SECONDS = {
+    "backend": Histogram("rk_backend_duration_seconds", "Time a request spent in database calls.", ("endpoint",)),
+    "template": Histogram("rk_template_duration_seconds", "Time a request spent rendering templates.", ("endpoint",)),
+    "pdf": Histogram("rk_pdf_duration_seconds", "Time a request spent waiting on PDF renders.", ("endpoint",)),
+}
+BACKEND_CALLS = Counter("rk_backend_calls_total", "Database calls made while handling requests.", ("endpoint",))
+REQUESTS = Counter("rk_requests_total", "Requests handled, by response status.", ("endpoint", "status"))
+REGISTRY = [REQUEST_SECONDS, *COMPONENT_SECONDS.values(), BACKEND_CALLS, REQUESTS]
+
+
+class RequestTimer:
+    def __init__(self, endpoint, method):
+        self.endpoint = endpoint
+        self.method = method
+        self.started = time.perf_counter()
+        self.status = 500
+        self.spent = dict.fromkeys(COMPONENTS, 0.0)
+        self.backend_calls = 0
+        self.template_starts = []
+        self._lock = threading.Lock()
+
+    def add(self, component, seconds):
+        with self._lock:
+            self.spent[component] += seconds
+            if component == "backend":
+                self.backend_calls += 1
+
+    def finish(self):
+        labels = (self.endpoint,)
+        REQUEST_SECONDS.observe((self.endpoint, self.method), time.perf_counter() - self.started)
+        for component, seconds in self.spent.items():
+            COMPONENT_SECONDS[component].observe(labels, seconds)
+        if self.backend_calls:
+            BACKEND_CALLS.inc(labels, self.backend_calls)
+        REQUESTS.inc((self.endpoint, str(self.status)))
+
+
+# Copied into db.gather() worker threads along with the rest of the context
+_current = ContextVar("request_timer", default=None)
+
+
+@contextmanager
+def timed(component):
+    """Charge the enclosed block to `component` of the current request, if any."""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(component, time.perf_counter() - started)
+
+
+def _template_started(sender, template, context, **extra):
+    timer = _current.get()
+    if timer is not None:
+        timer.template_starts.append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    timer = _current.get()
+    if timer is not None and timer.template_starts:
+        timer.add("template", time.perf_counter() - timer.template_starts.pop())
+
+
+def init_app(app):
+    @app.before_request
+    def _start_timer():
+        request.environ["rk.metrics_token"] = _current.set(
+            RequestTimer(request.endpoint or "unmatched", request.method))
+
+    @app.after_request
+    def _record_status(response):
+        timer = _current.get()
+        if timer is not None:
+            timer.status = response.status_code
+        return response
+
+    # Teardown runs after a streamed response has finished, so exports are timed in full
+    @app.teardown_request
+    def _finish_timer(exc):
+        token = request.environ.pop("rk.metrics_token", None)
+        timer = _current.get()
+        if timer is not None:
+            timer.finish()
+        if token is not None:
+            try:
+                _current.reset(token)
+            except ValueError:
+                _current.set(None)
+
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+
+
+def render_latest():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,152 @@
+"""Money arithmetic in integer paise.
+
+One engine for cart totals, order totals and invoice GST. Line amounts are
+summed exactly as scaled integers (a float is read by its shortest repr, as
+Decimal(str(x)) does), and only the taxes and the grand total are rounded
+half-up to the paisa, all with integer arithmetic. That is the same result as
+the Decimal code _calc_totals_percent used, to the paisa, without a Decimal
+context per operation, and it equals the numeric round() in
+sql/update_order_details_batch.sql. batch_order_totals() groups flat
+order_items rows and totals every order in one pass, which is what reporting
+over a year of invoices needs.
+"""
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+
+Totals = namedtuple("Totals", "taxable cgst sgst grand")  # all in paise
+
+_PAISA = Decimal("0.01")
+_rates = {}
+
+
+def _div_half_up(numerator, denominator):
+    """numerator / denominator rounded half away from zero (Decimal ROUND_HALF_UP)."""
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    if numerator >= 0:
+        return (2 * numerator + denominator) // (2 * denominator)
+    return -((-2 * numerator + denominator) // (2 * denominator))
+
+
+def to_paise(value):
+    """Rupee amount (float, int, str or Decimal) to integer paise, rounded half-up."""
+    if value is None or value == "":
+        return 0
+    if isinstance(value, int):
+        return value * 100
+    if isinstance(value, float) and abs(value) < 1e9:
+        # Fast path: a float holding whole paise is within rounding noise of an integer
+        scaled = value * 100
+        nearest = round(scaled)
+        if abs(scaled - nearest) < 1e-6:
+            return int(nearest)
+    return int((Decimal(str(value)) / _PAISA).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_paise(paise):
+    return paise / 100
+
+
+def _ratio(value):
+    """(numerator, denominator) of a decimal quantity or percent, cached per value."""
+    ratio = _rates.get(value)
+    if ratio is None:
+        ratio = _rates[value] = Decimal(str(value or 0)).as_integer_ratio()
+    return ratio
+
+
+def line_total_paise(price, quantity, discount=0):
+    """price x quantity - discount, in paise; fractional quantities round half-up."""
+    price_paise = to_paise(price)
+    if isinstance(quantity, int) or float(quantity).is_integer():
+        gross = price_paise * int(quantity)
+    else:
+        num, den = _ratio(quantity)
+        gross = _div_half_up(price_paise * num, den)
+    return gross - to_paise(discount)
+
+
+def _exact(value):
+    """(n, k) with value == n / 10**k exactly; floats are read by their shortest repr."""
+    if value is None or value == "":
+        return 0, 0
+    if isinstance(value, int):
+        return value, 0
+    text = repr(value) if isinstance(value, float) else str(value)
+    whole, _, fraction = text.partition(".")
+    if whole.lstrip("-").isdigit() and (fraction.isdigit() or not fraction):
+        return int(whole + fraction), len(fraction)
+    sign, digits, exponent = Decimal(text).as_tuple()  # exponent notation
+    n = int("".join(map(str, digits))) * (-1 if sign else 1)
+    return (n * 10 ** exponent, 0) if exponent >= 0 else (n, -exponent)
+
+
+def _add(total, amount):
+    (n, k), (m, j) = total, amount
+    if j > k:
+        n, k = n * 10 ** (j - k), j
+    elif j < k:
+        m *= 10 ** (k - j)
+    return n + m, k
+
+
+def _line_exact(line):
+    # Normalized invoice lines already carry their line total
+    if "line_total" in line:
+        return _exact(line["line_total"])
+    price, quantity = _exact(line.get("price_at_purchase", line.get("price", 0))), _exact(line.get("quantity", 0))
+    gross = (price[0] * quantity[0], price[1] + quantity[1])
+    discount = _exact(line.get("discount_amount", 0))
+    return _add(gross, (-discount[0], discount[1]))
+
+
+def _subtotal(lines):
+    total = (0, 0)
+    for line in lines:
+        total = _add(total, _line_exact(line))
+    return total
+
+
+def _tax(n, scale, percent):
+    num, den = _ratio(percent)
+    return _div_half_up(n * num, den * scale)
+
+
+def _totals(subtotal, cgst_percent, sgst_percent):
+    n, k = subtotal
+    scale = 10 ** k
+    cgst = _tax(n, scale, cgst_percent)
+    sgst = _tax(n, scale, sgst_percent)
+    # The grand total rounds the exact subtotal plus the rounded taxes, once
+    return Totals(_div_half_up(n * 100, scale), cgst, sgst, _div_half_up(n * 100 + (cgst + sgst) * scale, scale))
+
+
+def apply_percent(paise, percent):
+    """paise changed by `percent` (e.g. 5 or -2.5), rounded half-up to the paisa."""
+    num, den = _ratio(percent)
+    return _div_half_up(paise * (100 * den + num), 100 * den)
+
+
+def totals_from_subtotal(taxable, cgst_percent, sgst_percent):
+    """Totals for a taxable value already in paise."""
+    return _totals((taxable, 2), cgst_percent, sgst_percent)
+
+
+def order_totals(lines, cgst_percent=0, sgst_percent=0):
+    """Totals (paise) for one order's lines."""
+    return _totals(_subtotal(lines), cgst_percent, sgst_percent)
+
+
+def order_subtotal(lines):
+    """Exact sum of the lines in rupees, before any rounding (what invoices show as taxable value)."""
+    n, k = _subtotal(lines)
+    return n / 10 ** k
+
+
+def batch_order_totals(rows, cgst_percent=0, sgst_percent=0, key="order_id"):
+    """{order id: Totals} for flat order_items rows from any number of orders, in one pass."""
+    subtotals = {}
+    for row in rows:
+        order_id = row[key]
+        subtotals[order_id] = _add(subtotals.get(order_id, (0, 0)), _line_exact(row))
+    return {order_id: _totals(subtotal, cgst_percent, sgst_percent) for order_id, subtotal in subtotals.items()}
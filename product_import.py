@@ -0,0 +1,143 @@
+"""Validation for bulk product CSV imports.
+
+validate_products() checks every row of an uploaded sheet against the current
+catalog and returns what to write together with every problem found, one line
+per bad cell, instead of stopping at the first bad value. Rows match existing
+products by `id`, or by exact (case-insensitive) name when there is no id
+column; anything else is a new product. Empty cells leave the current value.
+Updates carry only the columns that actually change, so a price list never
+writes back a stock figure it did not set.
+"""
+import csv
+import io
+import os
+from decimal import Decimal, InvalidOperation
+
+import money
+
+MAX_IMPORT_ROWS = 20000
+MAX_NAME_LENGTH = 200
+# Sheet column -> products column
+IMPORT_COLUMNS = {"id": "id", "name": "name", "category": "category", "price": "price", "stock": "stock",
+                  "description": "description", "image_url": "imageUrl"}
+_HEADER_ALIASES = {"imageurl": "image_url", "image": "image_url", "product_id": "id", "product_name": "name"}
+
+
+def new_product_id():
+    return f"prod_{os.urandom(8).hex()}"
+
+
+def _header(name):
+    key = (name or "").strip().lower().replace(" ", "_")
+    return _HEADER_ALIASES.get(key, key)
+
+
+def _parse_price(text):
+    """Rupees from '1,250.50' or '₹1250.5' -> float rounded to the paisa, or raise ValueError."""
+    try:
+        value = Decimal(text.replace("₹", "").replace(",", "").strip())
+    except InvalidOperation:
+        raise ValueError(f"price '{text}' is not a number")
+    if not value.is_finite() or value < 0:
+        raise ValueError(f"price '{text}' must be zero or more")
+    return money.from_paise(money.to_paise(value))
+
+
+def _parse_stock(text):
+    try:
+        value = Decimal(text.replace(",", "").strip())
+    except InvalidOperation:
+        raise ValueError(f"stock '{text}' is not a number")
+    if not value.is_finite() or value != value.to_integral_value() or value < 0:
+        raise ValueError(f"stock '{text}' must be a whole number, zero or more")
+    return int(value)
+
+
+def validate_products(text, catalog):
+    """Check an import sheet against `catalog` (current product rows).
+
+    Returns a dict with `inserts` (full product rows), `updates` (id, name and
+    the changed columns only), `unchanged` (count), `errors` ([(line, message)])
+    and `ignored_columns`.
+    """
+    result = {"inserts": [], "updates": [], "unchanged": 0, "errors": [], "ignored_columns": []}
+    reader = csv.reader(io.StringIO(text))
+    header = [_header(name) for name in next(reader, [])]
+    columns = {name: i for i, name in enumerate(header) if name in IMPORT_COLUMNS}
+    result["ignored_columns"] = [name for name in header if name and name not in IMPORT_COLUMNS]
+    if "id" not in columns and "name" not in columns:
+        result["errors"].append((1, "the header needs an id or a name column"))
+        return result
+
+    by_id = {p["id"]: p for p in catalog}
+    by_name = {}
+    for p in catalog:
+        by_name.setdefault((p.get("name") or "").strip().lower(), []).append(p)
+    seen = {}  # product id or new name -> line it first appeared on
+
+    for line, cells in enumerate(reader, start=2):
+        if line - 1 > MAX_IMPORT_ROWS:
+            result["errors"].append((line, f"more than {MAX_IMPORT_ROWS} rows; split the file"))
+            break
+        values = {name: (cells[i].strip() if i < len(cells) else "") for name, i in columns.items()}
+        if not any(values.values()):
+            continue
+
+        errors = []
+        product_id, name = values.get("id", ""), values.get("name", "")
+        existing = None
+        if product_id:
+            existing = by_id.get(product_id)
+            if existing is None:
+                errors.append(f"no product with id '{product_id}'")
+        elif name:
+            matches = by_name.get(name.lower(), [])
+            if len(matches) > 1:
+                errors.append(f"{len(matches)} products are named '{name}'; add an id column to pick one")
+            elif matches:
+                existing = matches[0]
+        if len(name) > MAX_NAME_LENGTH:
+            errors.append(f"name is longer than {MAX_NAME_LENGTH} characters")
+
+        changes = {}
+        if name:
+            changes["name"] = name
+        for column in ("category", "description", "image_url"):
+            if values.get(column):
+                changes[IMPORT_COLUMNS[column]] = values[column]
+        for column, parse in (("price", _parse_price), ("stock", _parse_stock)):
+            if values.get(column):
+                try:
+                    changes[column] = parse(values[column])
+                except ValueError as e:
+                    errors.append(str(e))
+
+        if existing is None and not product_id:
+            if not name:
+                errors.append("new products need a name")
+            if not values.get("price"):
+                errors.append("new products need a price")
+
+        key = existing["id"] if existing else (None if product_id else name.lower())
+        if key in seen:
+            errors.append(f"same product as line {seen[key]}")
+        elif key:
+            seen[key] = line
+
+        if errors:
+            result["errors"].extend((line, message) for message in errors)
+            continue
+
+        if existing is None:
+            result["inserts"].append({"id": new_product_id(), "name": name, "category": changes.get("category"),
+                                      "price": changes["price"], "stock": changes.get("stock", 0),
+                                      "description": changes.get("description"),
+                                      "imageUrl": changes.get("imageUrl")})
+            continue
+        changed = {column: value for column, value in changes.items() if existing.get(column) != value}
+        if changed:
+            # name goes along so the upsert's insert half satisfies NOT NULL
+            result["updates"].append({"id": existing["id"], "name": existing.get("name"), **changed})
+        else:
+            result["unchanged"] += 1
+    return result
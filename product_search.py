@@ -0,0 +1,170 @@
+"""In-memory product search index (prefix + trigram fuzzy matching).
+
+Indexes product name, category and description so the shop can answer
+partial queries like "pvc 3/4 elb" without shipping the catalog to the browser.
+The index is updated per product (upsert/remove) instead of being rebuilt.
+"""
+import re
+import bisect
+import threading
+
+# Tokens keep inner "/" and "." so sizes like 3/4 or 1.5 stay one term
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[/.][a-z0-9]+)*")
+
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "description": 1.0}
+
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.6
+FUZZY_MIN_SIMILARITY = 0.4
+MAX_PREFIX_TERMS = 200
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProductSearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}   # term -> {product_id: field weight}
+        self._terms = []      # sorted vocabulary, for prefix ranges
+        self._trigrams = {}   # trigram -> set of terms
+        self._docs = {}       # product_id -> (signature, {term: weight})
+        self._names = {}      # product_id -> lowercased name, for ranking ties
+
+    def __len__(self):
+        return len(self._docs)
+
+    @staticmethod
+    def _signature(product):
+        return (product.get("name"), product.get("category"), product.get("description"))
+
+    def _add_term(self, term, product_id, weight):
+        postings = self._postings.get(term)
+        if postings is None:
+            postings = self._postings[term] = {}
+            bisect.insort(self._terms, term)
+            for gram in trigrams(term):
+                self._trigrams.setdefault(gram, set()).add(term)
+        postings[product_id] = weight
+
+    def _remove_term(self, term, product_id):
+        postings = self._postings.get(term)
+        if postings is None:
+            return
+        postings.pop(product_id, None)
+        if not postings:
+            del self._postings[term]
+            del self._terms[bisect.bisect_left(self._terms, term)]
+            for gram in trigrams(term):
+                terms = self._trigrams.get(gram)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._trigrams[gram]
+
+    def _remove_locked(self, product_id):
+        doc = self._docs.pop(product_id, None)
+        self._names.pop(product_id, None)
+        if doc is not None:
+            for term in doc[1]:
+                self._remove_term(term, product_id)
+
+    def upsert(self, product):
+        """Add a product or re-index it if its searchable fields changed."""
+        product_id = product["id"]
+        signature = self._signature(product)
+        with self._lock:
+            doc = self._docs.get(product_id)
+            if doc is not None and doc[0] == signature:
+                return
+            self._remove_locked(product_id)
+            terms = {}
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in tokenize(product.get(field)):
+                    terms[term] = max(terms.get(term, 0.0), weight)
+            for term, weight in terms.items():
+                self._add_term(term, product_id, weight)
+            self._docs[product_id] = (signature, terms)
+            self._names[product_id] = (product.get("name") or "").lower()
+
+    def remove(self, product_id):
+        with self._lock:
+            self._remove_locked(product_id)
+
+    def sync(self, products):
+        """Bring the index in line with a full product list, touching only what changed."""
+        seen = set()
+        for product in products:
+            seen.add(product["id"])
+            self.upsert(product)
+        with self._lock:
+            stale = [pid for pid in self._docs if pid not in seen]
+            for product_id in stale:
+                self._remove_locked(product_id)
+
+    def _match_token(self, token):
+        """Best score per product for one query token."""
+        scores = {}
+
+        def credit(term, base):
+            for product_id, weight in self._postings[term].items():
+                score = base * weight
+                if score > scores.get(product_id, 0.0):
+                    scores[product_id] = score
+
+        if token in self._postings:
+            credit(token, EXACT_SCORE)
+
+        # Prefix: every vocabulary term in [token, token + U+FFFF)
+        start = bisect.bisect_right(self._terms, token)
+        end = bisect.bisect_left(self._terms, token + "\uffff", lo=start)
+        for term in self._terms[start:min(end, start + MAX_PREFIX_TERMS)]:
+            # Shorter completions rank above long ones ("elb" -> "elbow" before "elbowjoint")
+            credit(term, PREFIX_SCORE * len(token) / len(term))
+
+        # Fuzzy: only worth it for tokens long enough to have meaningful trigrams
+        if len(token) >= 3:
+            query_grams = trigrams(token)
+            shared = {}
+            for gram in query_grams:
+                for term in self._trigrams.get(gram, ()):
+                    shared[term] = shared.get(term, 0) + 1
+            for term, common in shared.items():
+                similarity = common / (len(query_grams) + len(trigrams(term)) - common)
+                if similarity >= FUZZY_MIN_SIMILARITY and not term.startswith(token):
+                    credit(term, FUZZY_SCORE * similarity)
+        return scores
+
+    def search(self, query, limit=None):
+        """Ranked [(score, product_id)]; every query token must match something."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        phrase = " ".join(tokens)
+        with self._lock:
+            totals = None
+            for token in tokens:
+                scores = self._match_token(token)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {pid: totals[pid] + s for pid, s in scores.items() if pid in totals}
+                if not totals:
+                    return []
+            ranked = []
+            for product_id, score in totals.items():
+                name = self._names.get(product_id, "")
+                if name.startswith(phrase):
+                    score += 1.0
+                ranked.append((round(score, 4), product_id, name))
+        ranked.sort(key=lambda r: (-r[0], r[2], r[1]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(score, product_id) for score, product_id, _ in ranked]
@@ -0,0 +1,28 @@
+-- admin_dashboard_stats: the dashboard's headline numbers, computed in the
+-- database so the app no longer downloads every order and profile row.
+--
+-- Called from main.py: supabase.rpc('admin_dashboard_stats', {})
+
+create index if not exists orders_status_idx on orders (status);
+create index if not exists orders_date_idx on orders (date desc);
+create index if not exists profiles_role_idx on profiles (role);
+
+create or replace function admin_dashboard_stats()
+returns json
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select json_build_object(
+        'total_revenue', coalesce((select sum(total) from orders), 0),
+        'total_orders', (select count(*) from orders),
+        'pending_orders', (select count(*) from orders where status = 'Pending'),
+        'total_customers', (select count(*) from profiles where role = 'customer')
+    );
+$$;
+
+-- Security definer: only the server's data client (service-role key) may call it.
+-- Admin sign-ins happen on a separate client, so it never runs as `authenticated`.
+revoke execute on function admin_dashboard_stats() from public, anon, authenticated;
+grant execute on function admin_dashboard_stats() to service_role;
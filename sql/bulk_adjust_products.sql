@@ -0,0 +1,33 @@
+-- bulk_adjust_products: change the price and/or stock of every product in a
+-- category (or of all products) with one UPDATE, for the admin bulk adjust tool.
+--
+-- Prices move by price_percent (e.g. 5 or -2.5) and are rounded to paise
+-- half-up, like money.py. Stock moves by stock_delta and never goes below zero.
+-- The change is made in place, so checkouts running at the same time are not
+-- overwritten by a stale stock figure.
+--
+-- Called from main.py: supabase.rpc('bulk_adjust_products',
+--     {'target_category': 'Cement' or None, 'price_percent': 5, 'stock_delta': 0})
+
+create or replace function bulk_adjust_products(target_category text, price_percent numeric, stock_delta integer)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    changed integer;
+begin
+    update products
+    set price = round(price::numeric * (100 + coalesce(price_percent, 0)) / 100, 2),
+        stock = greatest(stock + coalesce(stock_delta, 0), 0)
+    where target_category is null or category = target_category;
+    get diagnostics changed = row_count;
+    return changed;
+end;
+$$;
+
+-- Security definer: only the server's data client (service-role key) may call it.
+-- Admin sign-ins happen on a separate client, so it never runs as `authenticated`.
+revoke execute on function bulk_adjust_products(text, numeric, integer) from public, anon, authenticated;
+grant execute on function bulk_adjust_products(text, numeric, integer) to service_role;
@@ -0,0 +1,41 @@
+-- orders.updated_at: moves on every change to an order or its items, so the
+-- invoice views can answer If-None-Match with one single-column query.
+--
+-- Read from main.py: invoice_etag()
+
+alter table orders add column if not exists updated_at timestamptz not null default clock_timestamp();
+
+create or replace function orders_touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
+
+create or replace function order_items_touch_order()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        update orders set updated_at = clock_timestamp() where id = old.order_id;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        update orders set updated_at = clock_timestamp() where id = new.order_id;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists orders_touch_updated_at on orders;
+create trigger orders_touch_updated_at
+    before update on orders
+    for each row execute function orders_touch_updated_at();
+
+drop trigger if exists order_items_touch_order on order_items;
+create trigger order_items_touch_order
+    after insert or update or delete on order_items
+    for each row execute function order_items_touch_order();
@@ -0,0 +1,76 @@
+-- place_order_batch: create an order, its items and all stock decrements in one
+-- call. The function body runs in a single transaction, so any shortfall or
+-- insert error rolls back everything (no orphan order rows or half-applied
+-- decrements).
+--
+-- Prices and the order total come from the products table, never from the
+-- payload. Only the server's service-role key may call it.
+--
+-- Called from main.py: supabase.rpc('place_order_batch', {'order_record': {...}, 'items': [...]})
+
+create or replace function place_order_batch(order_record jsonb, items jsonb)
+returns text
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    short_name text;
+begin
+    if items is null or jsonb_array_length(items) = 0 then
+        raise exception 'Order has no items';
+    end if;
+
+    -- Inserted first with a zero total, filled in from the locked prices below
+    insert into orders (id, user_id, customer_name, total, status)
+    select id, user_id, customer_name, 0, coalesce(status, 'Pending')
+    from jsonb_populate_record(null::orders, order_record);
+
+    -- Lock the affected products in id order so concurrent checkouts cannot deadlock
+    perform 1
+    from products
+    where id in (select x->>'product_id' from jsonb_array_elements(items) as x)
+    order by id
+    for update;
+
+    select coalesce(p.name, lines.product_id) into short_name
+    from (
+        select x->>'product_id' as product_id, sum((x->>'quantity')::integer) as quantity
+        from jsonb_array_elements(items) as x
+        group by 1
+    ) as lines
+    left join products p on p.id = lines.product_id
+    where p.id is null or p.stock < lines.quantity
+    limit 1;
+    if found then
+        raise exception 'Not enough stock for %', short_name;
+    end if;
+
+    -- One UPDATE for every line; the same product may appear more than once
+    update products p
+    set stock = p.stock - lines.quantity
+    from (
+        select x->>'product_id' as product_id, sum((x->>'quantity')::integer) as quantity
+        from jsonb_array_elements(items) as x
+        group by 1
+    ) as lines
+    where p.id = lines.product_id;
+
+    insert into order_items (id, order_id, product_id, quantity, price_at_purchase, discount_amount)
+    select x.id, x.order_id, x.product_id, x.quantity, p.price, 0
+    from jsonb_populate_recordset(null::order_items, items) as x
+    join products p on p.id = x.product_id;
+
+    update orders
+    set total = (select round(coalesce(sum(oi.price_at_purchase::numeric * oi.quantity), 0), 2)
+                 from order_items oi where oi.order_id = order_record->>'id')
+    where id = order_record->>'id';
+
+    return order_record->>'id';
+end;
+$$;
+
+-- Security definer: only the server's data client (service-role key) may call it.
+-- Customer sign-ins happen on a separate client, so it never runs as `authenticated`.
+revoke execute on function place_order_batch(jsonb, jsonb) from public, anon, authenticated;
+grant execute on function place_order_batch(jsonb, jsonb) to service_role;
@@ -0,0 +1,51 @@
+-- update_order_details_batch: apply an admin's order edit (every line's quantity
+-- and discount, plus the status) in one call and one transaction, then recompute
+-- the order total from the stored lines.
+--
+-- The total uses numeric arithmetic, matching the Decimal rules in
+-- _calc_totals_percent (main.py): exact line totals, rounded once to paise
+-- half-up (round() on a positive numeric rounds half away from zero).
+--
+-- Called from main.py: supabase.rpc('update_order_details_batch',
+--     {'order_id_to_update': ..., 'new_status': ..., 'items': [{'id', 'quantity', 'discount_amount'}, ...]})
+
+create index if not exists order_items_order_id_idx on order_items (order_id);
+
+create or replace function update_order_details_batch(order_id_to_update text, new_status text, items jsonb)
+returns numeric
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    new_total numeric;
+begin
+    -- One UPDATE for every edited line; ids from other orders are ignored
+    update order_items oi
+    set quantity = (x->>'quantity')::integer,
+        discount_amount = coalesce((x->>'discount_amount')::numeric, 0)
+    from jsonb_array_elements(coalesce(items, '[]'::jsonb)) as x
+    where oi.order_id = order_id_to_update
+      and oi.id::text = x->>'id';
+
+    select round(coalesce(sum(oi.price_at_purchase::numeric * oi.quantity - oi.discount_amount::numeric), 0), 2)
+    into new_total
+    from order_items oi
+    where oi.order_id = order_id_to_update;
+
+    update orders
+    set status = coalesce(new_status, status),
+        total = new_total
+    where id = order_id_to_update;
+    if not found then
+        raise exception 'Order % not found', order_id_to_update;
+    end if;
+
+    return new_total;
+end;
+$$;
+
+-- Security definer: only the server's data client (service-role key) may call it.
+-- Admin sign-ins happen on a separate client, so it never runs as `authenticated`.
+revoke execute on function update_order_details_batch(text, text, jsonb) from public, anon, authenticated;
+grant execute on function update_order_details_batch(text, text, jsonb) to service_role;
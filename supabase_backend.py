@@ -0,0 +1,54 @@
+"""Hosted Supabase clients with a tuned PostgREST connection pool.
+
+Imported by db.py only when the supabase backend is first built, so the SQLite
+backend and a cold `import main` never load supabase, postgrest or httpx.
+"""
+import httpx
+from postgrest import SyncPostgrestClient
+from postgrest.utils import SyncClient
+from supabase import Client
+from supabase.lib.client_options import ClientOptions
+
+from db import DB_MAX_CONNECTIONS, DB_KEEPALIVE_CONNECTIONS, DB_KEEPALIVE_EXPIRY, DB_CONNECT_TIMEOUT, DB_TIMEOUT
+from metrics import timed
+
+DB_LIMITS = httpx.Limits(
+    max_connections=DB_MAX_CONNECTIONS,
+    max_keepalive_connections=DB_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=DB_KEEPALIVE_EXPIRY,
+)
+# Waiting for a free pooled connection counts against the connect budget
+DB_HTTP_TIMEOUT = httpx.Timeout(DB_TIMEOUT, connect=DB_CONNECT_TIMEOUT, pool=DB_CONNECT_TIMEOUT)
+
+
+class _TimedSession(SyncClient):
+    def send(self, request, **kwargs):
+        with timed("backend"):
+            return super().send(request, **kwargs)
+
+
+class _PooledPostgrestClient(SyncPostgrestClient):
+    def create_session(self, base_url, headers, timeout):
+        # Same arguments as postgrest 0.13's own create_session, plus the pool limits
+        return _TimedSession(base_url=base_url, headers=headers, timeout=timeout, limits=DB_LIMITS)
+
+
+class PooledClient(Client):
+    """supabase Client whose PostgREST session uses DB_LIMITS.
+
+    The library rebuilds the PostgREST client after auth events, so the pool
+    settings are applied in the factory rather than patched onto one session.
+    """
+
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout=DB_HTTP_TIMEOUT):
+        return _PooledPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout)
+
+
+def create_pooled_client(url, key):
+    return PooledClient(url, key, options=ClientOptions(postgrest_client_timeout=DB_HTTP_TIMEOUT))
+
+
+def create_auth_client(url, key):
+    # Keeps no session and refreshes no tokens: it only checks credentials
+    return Client(url, key, options=ClientOptions(auto_refresh_token=False, persist_session=False))
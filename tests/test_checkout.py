@@ -0,0 +1,167 @@
+"""Checkout after a customer signs in.
+
+Runs against the local SQLite backend; the supabase client test needs no network.
+"""
+import os
+import uuid
+import sqlite3
+import tempfile
+
+import pytest
+
+WORKDIR = tempfile.mkdtemp(prefix="rk-test-")
+# The backend is chosen when main is imported, so configure it first
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(WORKDIR, "db.sqlite3")
+os.environ["CART_DB_PATH"] = os.path.join(WORKDIR, "carts.sqlite3")
+os.environ["PDF_CACHE_DIR"] = os.path.join(WORKDIR, "pdf_cache")
+os.environ["IMAGE_STORE_DIR"] = os.path.join(WORKDIR, "images")
+
+import supabase_backend  # noqa: E402
+import main  # noqa: E402
+import metrics  # noqa: E402
+from local_backend import LocalClient, seed  # noqa: E402
+
+KEY = "header.payload.service-role-signature"
+
+
+@pytest.fixture(scope="module")
+def client():
+    seed(LocalClient(os.environ["SQLITE_PATH"]), products=20, orders=0, customers=2)
+    main.app.config["TESTING"] = True
+    return main.app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def data_client_never_signs_in(monkeypatch):
+    def sign_in(credentials):
+        raise AssertionError("the data client must never hold a user session")
+    monkeypatch.setattr(main.supabase.client().auth, "sign_in_with_password", sign_in)
+
+
+def login(client, email, password):
+    with client.session_transaction() as session:
+        session.clear()  # including flashes left by an earlier test's redirect
+    response = client.post("/login", data={"mode": "login", "email": email, "password": password})
+    assert response.status_code == 302
+    return response
+
+
+def test_login_then_place_order(client):
+    response = login(client, "customer0@local", "customer123")
+    assert response.headers["Location"].endswith("/shop")
+
+    product = main.supabase.table("products").select("id, stock").gt("stock", 2).limit(1).execute().data[0]
+    client.post("/cart/add", data={"product_id": product["id"], "quantity": 2})
+    response = client.post("/order/place")
+    assert response.headers["Location"].endswith("/my_orders")
+
+    with sqlite3.connect(os.environ["SQLITE_PATH"]) as conn:
+        placed = conn.execute("select count(*) from orders o join profiles p on p.id = o.user_id "
+                              "where p.name = 'Customer 0'").fetchone()[0]
+        stock = conn.execute("select stock from products where id = ?", (product["id"],)).fetchone()[0]
+    assert placed == 1
+    assert stock == product["stock"] - 2
+
+
+def test_admin_dashboard_stats_after_logins(client):
+    login(client, "customer1@local", "customer123")
+    login(client, "admin@local", "admin123")
+    response = client.get("/admin/dashboard")
+    assert response.status_code == 200
+    assert b"Could not load dashboard totals." not in response.data
+
+
+def test_admin_order_edit_after_logins(client):
+    product = main.supabase.table("products").select("id").gt("stock", 5).limit(1).execute().data[0]
+    order_id = f"ord_{uuid.uuid4().hex[:16]}"
+    item_id = str(uuid.uuid4())
+    main.supabase.rpc("place_order_batch", {
+        "order_record": {"id": order_id, "user_id": None, "customer_name": "Walk-in", "status": "Pending"},
+        "items": [{"id": item_id, "order_id": order_id, "product_id": product["id"], "quantity": 1}],
+    }).execute()
+
+    login(client, "customer1@local", "customer123")
+    login(client, "admin@local", "admin123")
+    client.post(f"/admin/orders/{order_id}/update_details",
+                data={"status": "In Process", f"qty_{item_id}": "3", f"discount_{item_id}": "0"})
+
+    with sqlite3.connect(os.environ["SQLITE_PATH"]) as conn:
+        status = conn.execute("select status from orders where id = ?", (order_id,)).fetchone()[0]
+        quantity = conn.execute("select quantity from order_items where id = ?", (item_id,)).fetchone()[0]
+    assert (status, quantity) == ("In Process", 3)
+
+
+def test_bulk_adjust_after_logins(client):
+    with sqlite3.connect(os.environ["SQLITE_PATH"]) as conn:
+        before = dict(conn.execute("select id, stock from products where category = 'Cement'"))
+
+    login(client, "customer1@local", "customer123")
+    login(client, "admin@local", "admin123")
+    client.post("/admin/products/adjust", data={"category": "Cement", "price_percent": "0", "stock_delta": "4"})
+
+    with sqlite3.connect(os.environ["SQLITE_PATH"]) as conn:
+        after = dict(conn.execute("select id, stock from products where category = 'Cement'"))
+    assert before and after == {product_id: stock + 4 for product_id, stock in before.items()}
+
+
+def test_sign_in_leaves_data_client_on_server_key(monkeypatch):
+    from gotrue.types import AuthResponse, Session, User
+
+    data = supabase_backend.create_pooled_client("https://example.supabase.co", KEY)
+    auth = supabase_backend.create_auth_client("https://example.supabase.co", KEY)
+    user = User(id="user-1", app_metadata={}, user_metadata={}, aud="authenticated",
+                created_at="2026-01-01T00:00:00Z")
+    session = Session(access_token="USER_JWT", refresh_token="r", expires_in=3600, token_type="bearer",
+                      user=user)
+    monkeypatch.setattr(auth.auth, "_request", lambda *args, **kwargs: AuthResponse(session=session, user=user))
+
+    auth.auth.sign_in_with_password({"email": "customer0@local", "password": "customer123"})
+
+    assert auth.postgrest.session.headers["Authorization"] == "Bearer USER_JWT"
+    checkout = data.rpc("place_order_batch", {"order_record": {}, "items": []})
+    assert checkout.session.headers["Authorization"] == f"Bearer {KEY}"
+
+
+def test_invoice_without_billing_settings_is_retried_not_faked(client, monkeypatch):
+    order_id = main.supabase.table("orders").select("id").limit(1).execute().data[0]["id"]
+
+    def unavailable(page_key, version):
+        raise TimeoutError("settings backend timed out")
+    monkeypatch.setattr(main, "_fetch_settings_row", unavailable)
+    monkeypatch.delitem(main._settings_cache, "billing_settings", raising=False)
+
+    login(client, "admin@local", "admin123")
+    for path in (f"/admin/order/{order_id}/bill", f"/admin/order/{order_id}/pdf"):
+        response = client.get(path)
+        assert response.status_code == 503 and response.headers["Retry-After"]
+    cached = os.listdir(main.PDF_CACHE_DIR) if os.path.isdir(main.PDF_CACHE_DIR) else []
+    assert not [name for name in cached if name.startswith(main._pdf_cache_prefix(order_id))]
+
+
+def test_invoice_304_skips_loading_items(client, monkeypatch):
+    order_id = main.supabase.table("orders").select("id").limit(1).execute().data[0]["id"]
+    login(client, "admin@local", "admin123")
+    first = client.get(f"/admin/order/{order_id}/bill")
+    assert first.status_code == 200 and first.headers["ETag"]
+
+    def load(order_id):
+        raise AssertionError("a 304 must not load the order items")
+    monkeypatch.setattr(main, "_load_order_and_items", load)
+    again = client.get(f"/admin/order/{order_id}/bill", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    monkeypatch.undo()
+
+    main.supabase.table("order_items").update({"discount_amount": 1}).eq("order_id", order_id).execute()
+    edited = client.get(f"/admin/order/{order_id}/bill", headers={"If-None-Match": first.headers["ETag"]})
+    assert edited.status_code == 200 and edited.headers["ETag"] != first.headers["ETag"]
+
+
+def test_shop_fragment_render_is_timed(client, monkeypatch):
+    charged = []
+    monkeypatch.setattr(metrics.RequestTimer, "add", lambda self, component, seconds: charged.append(component))
+    main._shop_fragments.clear()
+    login(client, "customer0@local", "customer123")
+    monkeypatch.setattr(main, "render_template", lambda *args, **kwargs: "")
+    client.get("/shop")
+    assert "template" in charged